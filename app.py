@@ -1,31 +1,46 @@
 #!/usr/bin/env python3
 
+from gevent import monkey
+monkey.patch_all()
+
+from gevent import get_hub
+
 import os
 import sys
-import json
-import threading
 import time
 from datetime import datetime
 from pathlib import Path
-from flask import Flask, render_template, jsonify, request, send_file
-from flask_socketio import SocketIO, emit
+from flask import Flask, Response, render_template, jsonify, request, send_file
+from flask_socketio import SocketIO, emit, join_room
 import logging
+import orjson
 
 # Add src directory to Python path
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
 from engagement_analyzer import EngagementAnalyzer
+from burnout_detector import RiskLevel, serialize_burnout_alerts
 
 # Initialize Flask app
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'engagement-pulse-secret-key'
-socketio = SocketIO(app, cors_allowed_origins="*")
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode='gevent')
 
 # Global variables
 analyzer = None
 current_analysis = None
 analysis_in_progress = False
 
+REPORTS_DIR = Path('reports').resolve()
+RAW_RESULTS_PATH = REPORTS_DIR / 'latest_raw.json'
+
+# Cached (slack_connected, db_stats, expires_at) for status checks
+STATUS_CACHE_TTL = 15
+status_cache = None
+
+# Last progress frame per analysis room, replayed to clients that subscribe late
+last_progress = {}
+
 def setup_logging():
     logging.basicConfig(
         level=logging.INFO,
@@ -50,38 +65,58 @@ def initialize_analyzer():
 def index():
     return render_template('dashboard.html')
 
-@app.route('/api/status')
-def get_status():
-    global analyzer, analysis_in_progress
+def invalidate_status_cache():
+    global status_cache
+    status_cache = None
+
+def get_status_payload(probe=True):
+    global analyzer, analysis_in_progress, status_cache
     
     if analyzer is None:
-        return jsonify({
+        return {
             'status': 'error',
             'message': 'Analyzer not initialized',
             'analyzer_ready': False,
             'analysis_in_progress': False
-        })
-    
-    # Test Slack connection
-    try:
-        slack_connected = analyzer.test_slack_connection()
-    except:
-        slack_connected = False
+        }
     
-    # Get database stats
-    try:
-        db_stats = analyzer.get_database_stats()
-    except:
-        db_stats = {}
+    now = time.time()
+    if probe and (status_cache is None or status_cache[2] <= now):
+        # Test Slack connection
+        try:
+            slack_connected = analyzer.test_slack_connection()
+        except:
+            slack_connected = False
+        
+        # Get database stats
+        try:
+            db_stats = analyzer.get_database_stats()
+        except:
+            db_stats = {}
+        
+        status_cache = (slack_connected, db_stats, now + STATUS_CACHE_TTL)
     
-    return jsonify({
+    payload = {
         'status': 'ready',
         'analyzer_ready': True,
-        'slack_connected': slack_connected,
         'analysis_in_progress': analysis_in_progress,
-        'database_stats': db_stats,
         'timestamp': datetime.now().isoformat()
-    })
+    }
+    
+    # Without a probe, reuse whatever was last seen (possibly stale) rather than hitting Slack
+    if status_cache is not None:
+        slack_connected, db_stats, _ = status_cache
+        payload['slack_connected'] = slack_connected
+        payload['database_stats'] = db_stats
+    
+    return payload
+
+def push_status(probe=True):
+    socketio.emit('status', get_status_payload(probe))
+
+@app.route('/api/status')
+def get_status():
+    return jsonify(get_status_payload())
 
 @app.route('/api/analyze', methods=['POST'])
 def start_analysis():
@@ -102,93 +137,111 @@ def start_analysis():
     # Get parameters
     data = request.get_json() or {}
     days_back = data.get('days', 7)
+    analysis_id = str(int(time.time()))
+    room = analysis_room(analysis_id)
     
-    # Start analysis in background thread
+    # Subscribe the requesting dashboard to its analysis progress; without a sid
+    # there is no one to subscribe, so progress goes to every connected client
+    sid = data.get('sid')
+    if sid:
+        join_room(room, sid=sid, namespace='/')
+    
+    # Only one analysis runs at a time, so earlier rooms have nothing left to replay
+    last_progress.clear()
+    
+    # Start analysis as a Socket.IO background task
     analysis_in_progress = True
-    thread = threading.Thread(target=run_analysis_background, args=(days_back,))
-    thread.daemon = True
-    thread.start()
+    # Only the in-progress flag changed; re-probing Slack here would stall the request
+    push_status(probe=False)
+    socketio.start_background_task(run_analysis_background, days_back, room, not sid)
     
     return jsonify({
         'status': 'started',
         'message': f'Analysis started for {days_back} days',
-        'analysis_id': str(int(time.time()))
+        'analysis_id': analysis_id,
+        'room': room
     })
 
-def run_analysis_background(days_back):
+def run_in_native_thread(fn, *args, **kwargs):
+    # Analysis is CPU-bound; running it on the hub would stall heartbeats and every other request
+    return get_hub().threadpool.spawn(fn, *args, **kwargs).get()
+
+def analysis_room(analysis_id):
+    return f'analysis_{analysis_id}'
+
+def emit_progress(room, updates, broadcast=False):
+    frame = {'updates': updates}
+    last_progress[room] = frame
+    if broadcast:
+        socketio.emit('analysis_progress_batch', frame)
+    else:
+        socketio.emit('analysis_progress_batch', frame, to=room)
+
+def run_analysis_background(days_back, room, broadcast=False):
     global analysis_in_progress, current_analysis
     
     try:
-        # Send progress updates
-        socketio.emit('analysis_progress', {
-            'stage': 'starting',
-            'message': 'Starting analysis...',
-            'progress': 0
-        })
-        
-        # Test connection
-        socketio.emit('analysis_progress', {
-            'stage': 'connection',
-            'message': 'Testing Slack connection...',
-            'progress': 10
-        })
+        # Collect progress updates and flush them as a single frame
+        updates = [
+            {
+                'stage': 'starting',
+                'message': 'Starting analysis...',
+                'progress': 0
+            },
+            {
+                'stage': 'connection',
+                'message': 'Testing Slack connection...',
+                'progress': 10
+            }
+        ]
         
         if not analyzer.test_slack_connection():
             raise Exception("Failed to connect to Slack API")
         
         # Run analysis
-        socketio.emit('analysis_progress', {
+        updates.append({
             'stage': 'collecting',
             'message': f'Collecting {days_back} days of data...',
             'progress': 20
         })
+        emit_progress(room, updates, broadcast)
         
-        result = analyzer.run_analysis(
+        result = run_in_native_thread(
+            analyzer.run_analysis,
             days_back=days_back,
             generate_reports=True,
             print_summary=False,
             cleanup=True
         )
         
-        socketio.emit('analysis_progress', {
-            'stage': 'analyzing',
-            'message': 'Analyzing sentiment with GPT...',
-            'progress': 60
-        })
-        
-        time.sleep(1)  # Let GPT analysis complete
-        
-        socketio.emit('analysis_progress', {
-            'stage': 'reporting',
-            'message': 'Generating reports...',
-            'progress': 80
-        })
-        
         # Store result
         activity_patterns = result.get('activity_patterns', {})
         engagement_metrics = result.get('engagement_metrics', {})
         burnout_alerts = result.get('burnout_alerts', {})
+        metadata = result.get('analysis_metadata') or {}
+        summary = result.get('engagement_summary') or {}
+        channel_breakdown = engagement_metrics.get('by_channel', {})
         
         # Calculate additional metrics
         total_reactions = sum(
             channel_data.get('total_reactions', 0) 
-            for channel_data in engagement_metrics.get('by_channel', {}).values()
+            for channel_data in channel_breakdown.values()
         )
         
         # Calculate average thread participation
         thread_participation = 0
-        channel_count = len(engagement_metrics.get('by_channel', {}))
+        channel_count = len(channel_breakdown)
         if channel_count > 0:
             thread_participation = sum(
                 channel_data.get('total_messages', 0) * 0.1  # Estimate based on engagement
-                for channel_data in engagement_metrics.get('by_channel', {}).values()
+                for channel_data in channel_breakdown.values()
             ) / channel_count
         
         # Determine overall risk level
         risk_level = 'LOW'
         if burnout_alerts:
-            high_risk_count = sum(1 for alert in burnout_alerts.values() if alert.get('risk_level') == 'high')
-            medium_risk_count = sum(1 for alert in burnout_alerts.values() if alert.get('risk_level') == 'medium')
+            high_risk_count = sum(1 for alert in burnout_alerts.values() if alert.get('risk_level') == RiskLevel.HIGH)
+            medium_risk_count = sum(1 for alert in burnout_alerts.values() if alert.get('risk_level') == RiskLevel.MEDIUM)
             
             if high_risk_count > 0:
                 risk_level = 'HIGH'
@@ -199,12 +252,12 @@ def run_analysis_background(days_back):
             'timestamp': datetime.now().isoformat(),
             'days_analyzed': days_back,
             'results': {
-                'total_messages': result.get('analysis_metadata', {}).get('total_messages', 0),
-                'overall_sentiment': result.get('engagement_summary', {}).get('overall_avg_sentiment', 0),
-                'overall_engagement': result.get('engagement_summary', {}).get('overall_avg_engagement', 0),
-                'channels_analyzed': result.get('analysis_metadata', {}).get('channels_analyzed', []),
-                'burnout_alerts': len(result.get('burnout_alerts', {})),
-                'sentiment_distribution': result.get('engagement_summary', {}).get('sentiment_distribution', {}),
+                'total_messages': metadata.get('total_messages', 0),
+                'overall_sentiment': summary.get('overall_avg_sentiment', 0),
+                'overall_engagement': summary.get('overall_avg_engagement', 0),
+                'channels_analyzed': metadata.get('channels_analyzed', []),
+                'burnout_alerts': len(burnout_alerts),
+                'sentiment_distribution': summary.get('sentiment_distribution', {}),
                 'report_paths': result.get('report_paths', []),
                 # Additional metrics for enhanced dashboard
                 'total_reactions': total_reactions,
@@ -214,29 +267,39 @@ def run_analysis_background(days_back):
                 'risk_level': risk_level,
                 'recommendations': result.get('recommendations', []),
                 'weekly_patterns': result.get('sentiment_analysis', {}).get('weekly_patterns', {}),
-                'channel_breakdown': engagement_metrics.get('by_channel', {}),
-                'burnout_details': burnout_alerts
-            },
-            'raw_data': result
+                'channel_breakdown': channel_breakdown,
+                'burnout_details': serialize_burnout_alerts(burnout_alerts)
+            }
         }
         
-        socketio.emit('analysis_progress', {
+        # Persist the full result once; it is served from disk on request
+        raw_payload = {**result, 'burnout_alerts': serialize_burnout_alerts(burnout_alerts)}
+        run_in_native_thread(lambda: RAW_RESULTS_PATH.write_bytes(orjson.dumps(
+            raw_payload,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+            default=str
+        )))
+        
+        # The terminal frame carries the results; intermediate stages are not sent
+        emit_progress(room, [{
             'stage': 'complete',
             'message': 'Analysis completed successfully!',
             'progress': 100,
             'results': current_analysis['results']
-        })
+        }], broadcast)
         
     except Exception as e:
         app.logger.error(f"Analysis failed: {e}")
-        socketio.emit('analysis_progress', {
+        emit_progress(room, [{
             'stage': 'error',
             'message': f'Analysis failed: {str(e)}',
             'progress': 0
-        })
+        }], broadcast)
     
     finally:
         analysis_in_progress = False
+        invalidate_status_cache()
+        push_status()
 
 @app.route('/api/results')
 def get_results():
@@ -248,83 +311,118 @@ def get_results():
             'message': 'No analysis results available'
         })
     
-    return jsonify({
-        'status': 'success',
-        'data': current_analysis
-    })
+    payload = orjson.dumps(
+        {'status': 'success', 'data': current_analysis},
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        default=str
+    )
+    return Response(payload, mimetype='application/json')
+
+@app.route('/api/results/raw')
+def get_raw_results():
+    if not RAW_RESULTS_PATH.is_file():
+        return jsonify({
+            'status': 'no_data',
+            'message': 'No analysis results available'
+        })
+    
+    return send_file(RAW_RESULTS_PATH, mimetype='application/json')
 
 @app.route('/api/reports')
 def list_reports():
-    reports_dir = Path('reports')
-    if not reports_dir.exists():
+    if not REPORTS_DIR.exists():
         return jsonify({'reports': []})
     
     reports = []
-    for file_path in reports_dir.glob('engagement_*'):
-        if file_path.is_file():
-            reports.append({
-                'filename': file_path.name,
-                'path': str(file_path),
-                'size': file_path.stat().st_size,
-                'modified': datetime.fromtimestamp(file_path.stat().st_mtime).isoformat(),
-                'type': 'HTML' if file_path.suffix == '.html' else 'JSON'
-            })
+    with os.scandir(REPORTS_DIR) as entries:
+        for entry in entries:
+            if entry.name.startswith('engagement_') and entry.is_file():
+                stat = entry.stat()
+                reports.append({
+                    'filename': entry.name,
+                    'path': os.path.join('reports', entry.name),
+                    'size': stat.st_size,
+                    'modified': datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                    'type': 'HTML' if entry.name.endswith('.html') else 'JSON'
+                })
     
     # Sort by modification time, newest first
     reports.sort(key=lambda x: x['modified'], reverse=True)
     
     return jsonify({'reports': reports})
 
+def resolve_report_path(filename):
+    file_path = (REPORTS_DIR / filename).resolve()
+    
+    # Reject anything that escapes the reports directory
+    if REPORTS_DIR not in file_path.parents or not file_path.is_file():
+        return None
+    
+    return file_path
+
 @app.route('/api/reports/<filename>')
 def download_report(filename):
-    reports_dir = Path('reports')
-    file_path = reports_dir / filename
+    file_path = resolve_report_path(filename)
     
-    if not file_path.exists() or not file_path.is_file():
+    if file_path is None:
         return jsonify({'error': 'Report not found'}), 404
     
     return send_file(file_path, as_attachment=True)
 
 @app.route('/api/reports/<filename>/view')
 def view_report(filename):
-    reports_dir = Path('reports')
-    file_path = reports_dir / filename
+    file_path = resolve_report_path(filename)
     
-    if not file_path.exists() or not file_path.is_file():
+    if file_path is None:
         return jsonify({'error': 'Report not found'}), 404
     
     if filename.endswith('.html'):
         return send_file(file_path)
     elif filename.endswith('.json'):
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        return jsonify(data)
+        # Reports are written by this app, so serve the bytes as-is
+        return send_file(file_path, mimetype='application/json')
     else:
         return jsonify({'error': 'Unsupported file type'}), 400
 
 @socketio.on('connect')
 def handle_connect():
     emit('connected', {'message': 'Connected to Engagement Pulse'})
+    emit('status', get_status_payload())
     app.logger.info('Client connected')
 
+@socketio.on('subscribe_analysis')
+def handle_subscribe_analysis(data):
+    analysis_id = (data or {}).get('analysis_id')
+    if analysis_id:
+        room = analysis_room(analysis_id)
+        join_room(room)
+        # Catch a late subscriber up on the frame it missed
+        frame = last_progress.get(room)
+        if frame:
+            emit('analysis_progress_batch', frame)
+
 @socketio.on('disconnect')
 def handle_disconnect():
     app.logger.info('Client disconnected')
 
-if __name__ == '__main__':
+def create_app():
     # Ensure directories exist
     os.makedirs('logs', exist_ok=True)
-    os.makedirs('reports', exist_ok=True)
+    os.makedirs(REPORTS_DIR, exist_ok=True)
     
     # Setup logging
     setup_logging()
     
     # Initialize analyzer
     app.logger.info("Initializing Engagement Analyzer...")
-    if initialize_analyzer():
-        app.logger.info("✅ Ready to serve!")
-        # Run the app
-        socketio.run(app, host='0.0.0.0', port=5000, debug=True, allow_unsafe_werkzeug=True)
-    else:
+    if not initialize_analyzer():
         app.logger.error("❌ Failed to initialize. Check your configuration.")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+    
+    app.logger.info("✅ Ready to serve!")
+    return app
+
+if __name__ == '__main__':
+    create_app()
+    # Run the app on the gevent WSGI server
+    socketio.run(app, host='0.0.0.0', port=5000)
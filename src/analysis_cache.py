@@ -0,0 +1,72 @@
+import hashlib
+import os
+import pickle
+import time
+from typing import Any, Dict, Optional
+import logging
+import orjson
+from pathlib import Path
+
+class AnalysisCache:
+    def __init__(self, cache_dir: str, ttl_seconds: int = 900):
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+        self.logger = logging.getLogger(__name__)
+        
+        if self.enabled:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+    
+    def make_key(self, **parts: Any) -> str:
+        return hashlib.sha1(orjson.dumps(parts, option=orjson.OPT_SORT_KEYS)).hexdigest()
+    
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"analysis_{key}.pickle"
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        
+        path = self._path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl_seconds:
+                return None
+            # Entries are only written by this app; pickle keeps enums and int keys intact
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable analysis cache entry {path.name}: {e}")
+            return None
+    
+    def set(self, key: str, value: Dict[str, Any]):
+        if not self.enabled:
+            return
+        
+        path = self._path(key)
+        tmp_path = path.with_suffix('.tmp')
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            self.logger.warning(f"Failed to write analysis cache entry: {e}")
+        
+        self.prune()
+    
+    def prune(self) -> int:
+        # Drop entries past their TTL
+        cutoff = time.time() - self.ttl_seconds
+        removed = 0
+        for path in self.cache_dir.glob('analysis_*.pickle'):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
\ No newline at end of file
@@ -2,6 +2,89 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any, Tuple
 import logging
 from collections import defaultdict
+from dataclasses import dataclass
+from enum import IntEnum
+import numpy as np
+
+class RiskLevel(IntEnum):
+    LOW = 0
+    MEDIUM = 1
+    HIGH = 2
+    
+    def __str__(self) -> str:
+        return self.name.lower()
+
+def serialize_burnout_alerts(burnout_alerts: Dict[str, Any]) -> Dict[str, Any]:
+    # JSON would emit the enum as an int, so map risk levels back to labels
+    return {
+        channel: {**alert, 'risk_level': str(alert['risk_level'])}
+        for channel, alert in burnout_alerts.items()
+    }
+
+@dataclass
+class ChannelSeries:
+    # Per-channel daily metrics as parallel arrays, sorted by date
+    dates: np.ndarray
+    avg_sentiment: np.ndarray
+    message_count: np.ndarray
+    
+    @classmethod
+    def from_daily_metrics(cls, channel_metrics: Dict[str, Dict]) -> 'ChannelSeries':
+        # Stored history comes back newest-first, so sort once here rather than trust dict order
+        dates = np.array(list(channel_metrics), dtype='datetime64[D]')
+        metrics = channel_metrics.values()
+        order = np.argsort(dates, kind='stable')
+        return cls(
+            dates=dates[order],
+            avg_sentiment=np.array([m['avg_sentiment'] for m in metrics], dtype=np.float64)[order],
+            message_count=np.array([m['message_count'] for m in metrics], dtype=np.int64)[order]
+        )
+    
+    def __len__(self) -> int:
+        return len(self.dates)
+    
+    def tail(self, days: int) -> 'ChannelSeries':
+        return ChannelSeries(
+            dates=self.dates[-days:],
+            avg_sentiment=self.avg_sentiment[-days:],
+            message_count=self.message_count[-days:]
+        )
+
+@dataclass(slots=True)
+class ChannelTrends:
+    sentiment_change: float = 0.0
+    engagement_change: float = 0.0
+    recent_avg_sentiment: float = 0.0
+    sentiment_trend: str = 'stable'
+    engagement_trend: str = 'stable'
+    
+    @classmethod
+    def from_dict(cls, trends: Dict[str, Any]) -> 'ChannelTrends':
+        return cls(
+            sentiment_change=trends.get('sentiment_change', 0.0),
+            engagement_change=trends.get('engagement_change', 0.0),
+            recent_avg_sentiment=trends.get('recent_avg_sentiment', 0.0),
+            sentiment_trend=trends.get('sentiment_trend', 'stable'),
+            engagement_trend=trends.get('engagement_trend', 'stable')
+        )
+
+# (predicate(alerts, trends, indicators_blob), message) pairs, in output order
+RECOMMENDATION_RULES = (
+    (lambda a, t, i: a['risk_level'] == RiskLevel.HIGH, "🚨 Immediate attention required - schedule team check-in"),
+    (lambda a, t, i: a['risk_level'] == RiskLevel.HIGH, "Consider workload review and redistribution"),
+    (lambda a, t, i: a['risk_level'] == RiskLevel.HIGH, "Implement stress-reduction initiatives"),
+    (lambda a, t, i: a['risk_level'] >= RiskLevel.MEDIUM, "Schedule one-on-one meetings with team members"),
+    (lambda a, t, i: a['risk_level'] >= RiskLevel.MEDIUM, "Review recent project demands and deadlines"),
+    (lambda a, t, i: a['consecutive_negative_days'] >= 3, "Address ongoing concerns causing negative sentiment"),
+    (lambda a, t, i: a['consecutive_negative_days'] >= 3, "Consider team building or morale-boosting activities"),
+    (lambda a, t, i: 'engagement drop' in i, "Investigate causes of reduced team engagement"),
+    (lambda a, t, i: 'engagement drop' in i, "Consider adjusting meeting schedules or communication methods"),
+    (lambda a, t, i: 'low messaging activity' in i, "Check if team members need additional support or resources"),
+    (lambda a, t, i: 'low messaging activity' in i, "Ensure communication channels are being used effectively"),
+    # Sentiment-specific recommendations
+    (lambda a, t, i: t.recent_avg_sentiment < -0.5, "Address critical team morale issues immediately"),
+    (lambda a, t, i: -0.5 <= t.recent_avg_sentiment < 0, "Focus on positive team interactions and recognition"),
+)
 
 class BurnoutDetector:
     def __init__(self, 
@@ -19,28 +102,30 @@ class BurnoutDetector:
         
         for channel_name, channel_metrics in daily_metrics.items():
             channel_alerts = self.analyze_channel_burnout(
-                channel_name, channel_metrics, engagement_trends.get(channel_name, {})
+                channel_name,
+                ChannelSeries.from_daily_metrics(channel_metrics),
+                ChannelTrends.from_dict(engagement_trends.get(channel_name, {}))
             )
             
-            if channel_alerts['risk_level'] != 'low':
+            if channel_alerts['risk_level'] != RiskLevel.LOW:
                 burnout_alerts[channel_name] = channel_alerts
         
         return burnout_alerts
     
-    def analyze_channel_burnout(self, channel_name: str, channel_metrics: Dict, 
-                               channel_trends: Dict) -> Dict[str, Any]:
+    def analyze_channel_burnout(self, channel_name: str, channel_metrics: ChannelSeries, 
+                               channel_trends: ChannelTrends) -> Dict[str, Any]:
         alerts = {
             'channel': channel_name,
-            'risk_level': 'low',
+            'risk_level': RiskLevel.LOW,
             'risk_score': 0.0,
             'warning_indicators': [],
             'recommendations': [],
             'consecutive_negative_days': 0,
-            'sentiment_trend': channel_trends.get('sentiment_trend', 'stable'),
-            'engagement_trend': channel_trends.get('engagement_trend', 'stable')
+            'sentiment_trend': channel_trends.sentiment_trend,
+            'engagement_trend': channel_trends.engagement_trend
         }
         
-        if not channel_metrics:
+        if not len(channel_metrics):
             return alerts
         
         # Analyze recent sentiment patterns
@@ -60,7 +145,7 @@ class BurnoutDetector:
             )
         
         # 2. Sharp sentiment decline
-        sentiment_change = channel_trends.get('sentiment_change', 0)
+        sentiment_change = channel_trends.sentiment_change
         if sentiment_change < -30:  # 30% decline
             risk_score += 30
             alerts['warning_indicators'].append(
@@ -68,7 +153,7 @@ class BurnoutDetector:
             )
         
         # 3. Engagement drop
-        engagement_change = channel_trends.get('engagement_change', 0)
+        engagement_change = channel_trends.engagement_change
         if engagement_change < -50:  # 50% drop
             risk_score += 25
             alerts['warning_indicators'].append(
@@ -76,7 +161,7 @@ class BurnoutDetector:
             )
         
         # 4. Very low recent sentiment
-        recent_sentiment = channel_trends.get('recent_avg_sentiment', 0)
+        recent_sentiment = channel_trends.recent_avg_sentiment
         if recent_sentiment < self.burnout_threshold:
             risk_score += 20
             alerts['warning_indicators'].append(
@@ -84,8 +169,7 @@ class BurnoutDetector:
             )
         
         # 5. Low message activity
-        recent_message_counts = [day['message_count'] for day in recent_days.values()]
-        avg_messages = sum(recent_message_counts) / len(recent_message_counts) if recent_message_counts else 0
+        avg_messages = float(recent_days.message_count.mean()) if len(recent_days) else 0
         if avg_messages < 2:  # Less than 2 messages per day
             risk_score += 15
             alerts['warning_indicators'].append(
@@ -93,88 +177,49 @@ class BurnoutDetector:
             )
         
         # 6. Declining trends
-        if channel_trends.get('sentiment_trend') == 'decreasing':
+        if channel_trends.sentiment_trend == 'decreasing':
             risk_score += 10
-        if channel_trends.get('engagement_trend') == 'decreasing':
+        if channel_trends.engagement_trend == 'decreasing':
             risk_score += 10
         
         alerts['risk_score'] = risk_score
         
         # Determine risk level
         if risk_score >= 70:
-            alerts['risk_level'] = 'high'
+            alerts['risk_level'] = RiskLevel.HIGH
         elif risk_score >= 40:
-            alerts['risk_level'] = 'medium'
+            alerts['risk_level'] = RiskLevel.MEDIUM
         else:
-            alerts['risk_level'] = 'low'
+            alerts['risk_level'] = RiskLevel.LOW
         
         # Generate recommendations
         alerts['recommendations'] = self.generate_recommendations(alerts, channel_trends)
         
         return alerts
     
-    def get_recent_days(self, channel_metrics: Dict, days: int = 7) -> Dict:
-        sorted_dates = sorted(channel_metrics.keys())
-        recent_dates = sorted_dates[-days:] if len(sorted_dates) >= days else sorted_dates
-        return {date: channel_metrics[date] for date in recent_dates}
+    def get_recent_days(self, channel_metrics: ChannelSeries, days: int = 7) -> ChannelSeries:
+        return channel_metrics.tail(days)
     
-    def count_consecutive_negative_days(self, recent_days: Dict) -> int:
-        if not recent_days:
+    def count_consecutive_negative_days(self, recent_days: ChannelSeries) -> int:
+        if not len(recent_days):
             return 0
         
-        sorted_dates = sorted(recent_days.keys(), reverse=True)  # Most recent first
-        consecutive_count = 0
-        
-        for date in sorted_dates:
-            if recent_days[date]['avg_sentiment'] < self.burnout_threshold:
-                consecutive_count += 1
-            else:
-                break
+        # Most recent first; stop at the first day at or above the threshold
+        not_negative = recent_days.avg_sentiment[::-1] >= self.burnout_threshold
+        if not not_negative.any():
+            return len(recent_days)
         
-        return consecutive_count
+        return int(np.argmax(not_negative))
     
-    def generate_recommendations(self, alerts: Dict, channel_trends: Dict) -> List[str]:
-        recommendations = []
-        risk_level = alerts['risk_level']
-        risk_score = alerts['risk_score']
-        
-        if risk_level == 'high':
-            recommendations.append("🚨 Immediate attention required - schedule team check-in")
-            recommendations.append("Consider workload review and redistribution")
-            recommendations.append("Implement stress-reduction initiatives")
-        
-        if risk_level in ['high', 'medium']:
-            recommendations.append("Schedule one-on-one meetings with team members")
-            recommendations.append("Review recent project demands and deadlines")
-            
-        if alerts['consecutive_negative_days'] >= 3:
-            recommendations.append("Address ongoing concerns causing negative sentiment")
-            recommendations.append("Consider team building or morale-boosting activities")
-        
-        if 'engagement drop' in ' '.join(alerts['warning_indicators']).lower():
-            recommendations.append("Investigate causes of reduced team engagement")
-            recommendations.append("Consider adjusting meeting schedules or communication methods")
-        
-        if 'low messaging activity' in ' '.join(alerts['warning_indicators']).lower():
-            recommendations.append("Check if team members need additional support or resources")
-            recommendations.append("Ensure communication channels are being used effectively")
-        
-        # Sentiment-specific recommendations
-        recent_sentiment = channel_trends.get('recent_avg_sentiment', 0)
-        if recent_sentiment < -0.5:
-            recommendations.append("Address critical team morale issues immediately")
-        elif recent_sentiment < 0:
-            recommendations.append("Focus on positive team interactions and recognition")
+    def generate_recommendations(self, alerts: Dict, channel_trends: ChannelTrends) -> List[str]:
+        indicators_blob = ' '.join(alerts['warning_indicators']).lower()
+        recommendations = [
+            message for predicate, message in RECOMMENDATION_RULES
+            if predicate(alerts, channel_trends, indicators_blob)
+        ]
         
         # Remove duplicates while preserving order
-        seen = set()
-        unique_recommendations = []
-        for rec in recommendations:
-            if rec not in seen:
-                seen.add(rec)
-                unique_recommendations.append(rec)
-        
-        return unique_recommendations
+        return list(dict.fromkeys(recommendations))
     
     def get_overall_burnout_assessment(self, burnout_alerts: Dict[str, Any]) -> Dict[str, Any]:
         if not burnout_alerts:
@@ -187,10 +232,26 @@ class BurnoutDetector:
                 'summary': "No burnout risks detected across monitored channels."
             }
         
-        high_risk_channels = [ch for ch, alert in burnout_alerts.items() if alert['risk_level'] == 'high']
-        medium_risk_channels = [ch for ch, alert in burnout_alerts.items() if alert['risk_level'] == 'medium']
-        
-        total_warnings = sum(len(alert['warning_indicators']) for alert in burnout_alerts.values())
+        high_risk_channels = []
+        medium_risk_channels = []
+        consecutive_negative_channels = []
+        low_engagement_channels = []
+        total_warnings = 0
+        
+        # Partition channels in a single pass over the alerts
+        for ch, alert in burnout_alerts.items():
+            if alert['risk_level'] == RiskLevel.HIGH:
+                high_risk_channels.append(ch)
+            elif alert['risk_level'] == RiskLevel.MEDIUM:
+                medium_risk_channels.append(ch)
+            
+            if alert['consecutive_negative_days'] >= 3:
+                consecutive_negative_channels.append(ch)
+            
+            if any('engagement drop' in warning.lower() for warning in alert['warning_indicators']):
+                low_engagement_channels.append(ch)
+            
+            total_warnings += len(alert['warning_indicators'])
         
         # Determine overall risk
         if high_risk_channels:
@@ -217,30 +278,25 @@ class BurnoutDetector:
             'medium_risk_channels': medium_risk_channels,
             'total_warnings': total_warnings,
             'summary': summary,
-            'priority_actions': self.get_priority_actions(burnout_alerts)
+            'priority_actions': self.get_priority_actions(
+                high_risk_channels, consecutive_negative_channels, low_engagement_channels
+            )
         }
     
-    def get_priority_actions(self, burnout_alerts: Dict[str, Any]) -> List[str]:
+    def get_priority_actions(self, high_risk_channels: List[str],
+                             consecutive_negative_channels: List[str],
+                             low_engagement_channels: List[str]) -> List[str]:
         actions = []
         
         # High priority actions for high-risk channels
-        high_risk_channels = [ch for ch, alert in burnout_alerts.items() if alert['risk_level'] == 'high']
         if high_risk_channels:
             actions.append(f"Immediately review teams in: {', '.join(high_risk_channels)}")
         
         # Check for specific patterns
-        channels_with_consecutive_negative = [
-            ch for ch, alert in burnout_alerts.items() 
-            if alert['consecutive_negative_days'] >= 3
-        ]
-        if channels_with_consecutive_negative:
-            actions.append(f"Address sustained negativity in: {', '.join(channels_with_consecutive_negative)}")
+        if consecutive_negative_channels:
+            actions.append(f"Address sustained negativity in: {', '.join(consecutive_negative_channels)}")
         
         # Engagement issues
-        low_engagement_channels = [
-            ch for ch, alert in burnout_alerts.items()
-            if any('engagement drop' in warning.lower() for warning in alert['warning_indicators'])
-        ]
         if low_engagement_channels:
             actions.append(f"Investigate engagement issues in: {', '.join(low_engagement_channels)}")
         
@@ -1,10 +1,27 @@
 import json
 import os
-from typing import Dict, Any, List
+import orjson
+from typing import Dict, Any, List, Tuple
 from pathlib import Path
 from dotenv import load_dotenv
 import logging
 
+def _split_channels(value: str) -> List[str]:
+    return value.split(',')
+
+# Environment overrides: (variable, config key path, parser)
+ENV_SCHEMA = (
+    ('DATABASE_PATH', ('database', 'path'), str),
+    ('REPORTS_DIR', ('reports', 'directory'), str),
+    ('ANALYSIS_DAYS', ('analysis_days',), int),
+    ('BURNOUT_THRESHOLD', ('burnout_threshold',), float),
+    ('RATE_LIMIT_DELAY', ('rate_limit_delay',), float),
+    ('LOG_LEVEL', ('logging', 'level'), str),
+    ('ANALYSIS_CACHE_TTL', ('cache', 'analysis_ttl_seconds'), int),
+    ('CHANNEL_CACHE_TTL', ('cache', 'channel_ttl_seconds'), int),
+    ('MONITORED_CHANNELS', ('monitored_channels',), _split_channels),
+)
+
 class ConfigManager:
     def __init__(self, config_file: str = "config.json", env_file: str = ".env"):
         self.config_file = Path(config_file)
@@ -17,6 +34,26 @@ class ConfigManager:
         
         # Load configuration
         self.config = self.load_config()
+        self.cache_settings()
+    
+    def cache_settings(self):
+        # Flatten frequently read values so getters are plain attribute reads
+        config = self.config
+        self.monitored_channels = tuple(config['monitored_channels'])
+        self.analysis_days = config['analysis_days']
+        self.burnout_threshold = config['burnout_threshold']
+        self.consecutive_negative_days = config['consecutive_negative_days']
+        self.engagement_drop_threshold = config['engagement_drop_threshold']
+        self.rate_limit_delay = config['rate_limit_delay']
+        self.database_path = config['database']['path']
+        self.database_retention_days = config['database']['retention_days']
+        self.reports_directory = config['reports']['directory']
+        self.report_formats = tuple(config['reports']['formats'])
+        self.include_daily_breakdown = config['reports']['include_daily_breakdown']
+        self.min_messages_per_day = config['min_messages_per_day']
+        self.cache_directory = config['cache']['directory']
+        self.analysis_cache_ttl = config['cache']['analysis_ttl_seconds']
+        self.channel_cache_ttl = config['cache']['channel_ttl_seconds']
     
     def load_config(self) -> Dict[str, Any]:
         # Default configuration
@@ -39,19 +76,25 @@ class ConfigManager:
             "reports": {
                 "directory": "./reports",
                 "formats": ["json", "html"],
+                "include_daily_breakdown": True,
                 "auto_cleanup_days": 90
             },
             "logging": {
                 "level": "INFO",
                 "file": "./logs/engagement.log"
+            },
+            "cache": {
+                "directory": "./data/cache",
+                "analysis_ttl_seconds": 900,
+                "channel_ttl_seconds": 86400
             }
         }
         
         # Load from JSON file if exists
         if self.config_file.exists():
             try:
-                with open(self.config_file, 'r') as f:
-                    file_config = json.load(f)
+                with open(self.config_file, 'rb') as f:
+                    file_config = orjson.loads(f.read())
                     # Merge with defaults
                     config = self.merge_configs(default_config, file_config)
             except Exception as e:
@@ -70,50 +113,40 @@ class ConfigManager:
     
     def merge_configs(self, default: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
         result = default.copy()
-        
-        for key, value in override.items():
-            if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-                result[key] = self.merge_configs(result[key], value)
-            else:
-                result[key] = value
+        stack = [(result, override)]
+        
+        while stack:
+            target, source = stack.pop()
+            for key, value in source.items():
+                current = target.get(key)
+                if isinstance(current, dict) and isinstance(value, dict):
+                    # Copy only the sections being merged so inputs stay untouched
+                    target[key] = current.copy()
+                    stack.append((target[key], value))
+                else:
+                    target[key] = value
         
         return result
     
     def apply_env_overrides(self, config: Dict[str, Any]) -> Dict[str, Any]:
-        # Environment variable mappings
-        env_mappings = {
-            'SLACK_BOT_TOKEN': lambda c: c,  # Special case - not stored in config
-            'DATABASE_PATH': lambda c: self.set_nested_value(c, 'database.path', os.getenv('DATABASE_PATH')),
-            'REPORTS_DIR': lambda c: self.set_nested_value(c, 'reports.directory', os.getenv('REPORTS_DIR')),
-            'ANALYSIS_DAYS': lambda c: self.set_nested_value(c, 'analysis_days', int(os.getenv('ANALYSIS_DAYS', c['analysis_days']))),
-            'BURNOUT_THRESHOLD': lambda c: self.set_nested_value(c, 'burnout_threshold', float(os.getenv('BURNOUT_THRESHOLD', c['burnout_threshold']))),
-            'RATE_LIMIT_DELAY': lambda c: self.set_nested_value(c, 'rate_limit_delay', float(os.getenv('RATE_LIMIT_DELAY', c['rate_limit_delay']))),
-            'LOG_LEVEL': lambda c: self.set_nested_value(c, 'logging.level', os.getenv('LOG_LEVEL', c['logging']['level'])),
-            'MONITORED_CHANNELS': lambda c: self.set_nested_value(c, 'monitored_channels', 
-                                                                os.getenv('MONITORED_CHANNELS', ','.join(c['monitored_channels'])).split(','))
-        }
-        
-        for env_var, setter in env_mappings.items():
-            if env_var in os.environ:
-                try:
-                    config = setter(config)
-                except Exception as e:
-                    self.logger.warning(f"Failed to apply environment override for {env_var}: {e}")
-        
-        return config
-    
-    def set_nested_value(self, config: Dict[str, Any], path: str, value: Any) -> Dict[str, Any]:
-        keys = path.split('.')
-        current = config
-        
-        # Navigate to the parent of the target key
-        for key in keys[:-1]:
-            if key not in current:
-                current[key] = {}
-            current = current[key]
+        # SLACK_BOT_TOKEN is read directly from the environment, not stored in config
+        for env_var, keys, parse in ENV_SCHEMA:
+            raw_value = os.environ.get(env_var)
+            if raw_value is None:
+                continue
+            
+            try:
+                value = parse(raw_value)
+            except Exception as e:
+                self.logger.warning(f"Failed to apply environment override for {env_var}: {e}")
+                continue
+            
+            # Walk to the parent of the target key
+            current = config
+            for key in keys[:-1]:
+                current = current.setdefault(key, {})
+            current[keys[-1]] = value
         
-        # Set the value
-        current[keys[-1]] = value
         return config
     
     def validate_config(self, config: Dict[str, Any]):
@@ -147,41 +180,53 @@ class ConfigManager:
             raise ValueError("SLACK_BOT_TOKEN environment variable is required")
         return token
     
-    def get_monitored_channels(self) -> List[str]:
-        return self.config['monitored_channels']
+    def get_monitored_channels(self) -> Tuple[str, ...]:
+        return self.monitored_channels
     
     def get_analysis_days(self) -> int:
-        return self.config['analysis_days']
+        return self.analysis_days
     
     def get_burnout_threshold(self) -> float:
-        return self.config['burnout_threshold']
+        return self.burnout_threshold
     
     def get_consecutive_negative_days(self) -> int:
-        return self.config['consecutive_negative_days']
+        return self.consecutive_negative_days
     
     def get_engagement_drop_threshold(self) -> float:
-        return self.config['engagement_drop_threshold']
+        return self.engagement_drop_threshold
     
     def get_rate_limit_delay(self) -> float:
-        return self.config['rate_limit_delay']
+        return self.rate_limit_delay
     
     def get_database_path(self) -> str:
-        return self.config['database']['path']
+        return self.database_path
     
     def get_database_retention_days(self) -> int:
-        return self.config['database']['retention_days']
+        return self.database_retention_days
     
     def get_reports_directory(self) -> str:
-        return self.config['reports']['directory']
+        return self.reports_directory
+    
+    def get_report_formats(self) -> Tuple[str, ...]:
+        return self.report_formats
+    
+    def get_include_daily_breakdown(self) -> bool:
+        return self.include_daily_breakdown
+    
+    def get_cache_directory(self) -> str:
+        return self.cache_directory
+    
+    def get_analysis_cache_ttl(self) -> int:
+        return self.analysis_cache_ttl
     
-    def get_report_formats(self) -> List[str]:
-        return self.config['reports']['formats']
+    def get_channel_cache_ttl(self) -> int:
+        return self.channel_cache_ttl
     
     def get_logging_config(self) -> Dict[str, Any]:
         return self.config['logging']
     
     def get_min_messages_per_day(self) -> int:
-        return self.config['min_messages_per_day']
+        return self.min_messages_per_day
     
     def get_sentiment_thresholds(self) -> Dict[str, float]:
         return self.config['sentiment_threshold']
@@ -202,6 +247,7 @@ class ConfigManager:
     def update_config(self, updates: Dict[str, Any]):
         self.config = self.merge_configs(self.config, updates)
         self.validate_config(self.config)
+        self.cache_settings()
         self.logger.info("Configuration updated")
     
     def get_full_config(self) -> Dict[str, Any]:
@@ -1,10 +1,233 @@
 import sqlite3
-import json
+import csv
+import gzip
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 import logging
+import orjson
 from pathlib import Path
 
+# Every table holds dated rows and is covered by stats, cleanup and export
+_TABLES = ('daily_metrics', 'sentiment_trends', 'burnout_alerts', 'activity_patterns', 'engagement_summary')
+
+# Database-level settings; pragmas are no-ops inside a transaction, so they run before the DDL
+_SCHEMA_PRAGMAS = (
+    # Only takes effect on a new database, before the first table is created;
+    # init_database converts older databases with a one-time VACUUM
+    'PRAGMA auto_vacuum=INCREMENTAL',
+    # WAL lets readers proceed while a write is in progress
+    'PRAGMA journal_mode=WAL',
+)
+
+_SCHEMA_SQL = '''
+CREATE TABLE IF NOT EXISTS daily_metrics (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    channel_name TEXT NOT NULL,
+    message_count INTEGER NOT NULL,
+    avg_sentiment REAL NOT NULL,
+    sentiment_std REAL DEFAULT 0.0,
+    emoji_count INTEGER DEFAULT 0,
+    reaction_count INTEGER DEFAULT 0,
+    active_hours_count INTEGER DEFAULT 0,
+    active_hours_mask INTEGER DEFAULT 0,
+    thread_participation REAL DEFAULT 0.0,
+    engagement_score REAL DEFAULT 0.0,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(date, channel_name)
+);
+
+CREATE TABLE IF NOT EXISTS sentiment_trends (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    channel_name TEXT NOT NULL,
+    sentiment_trend TEXT NOT NULL,
+    sentiment_change REAL DEFAULT 0.0,
+    engagement_trend TEXT NOT NULL,
+    engagement_change REAL DEFAULT 0.0,
+    message_trend TEXT NOT NULL,
+    message_change REAL DEFAULT 0.0,
+    recent_avg_sentiment REAL DEFAULT 0.0,
+    recent_avg_engagement REAL DEFAULT 0.0,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(date, channel_name)
+);
+
+CREATE TABLE IF NOT EXISTS burnout_alerts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    channel_name TEXT NOT NULL,
+    risk_level TEXT NOT NULL,
+    risk_score REAL NOT NULL,
+    consecutive_negative_days INTEGER DEFAULT 0,
+    warning_indicators BLOB DEFAULT '',
+    recommendations BLOB DEFAULT '',
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(date, channel_name)
+);
+
+CREATE TABLE IF NOT EXISTS activity_patterns (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    peak_hour INTEGER DEFAULT 12,
+    peak_day TEXT DEFAULT 'Monday',
+    hourly_distribution BLOB DEFAULT '{}',
+    daily_distribution BLOB DEFAULT '{}',
+    total_messages INTEGER DEFAULT 0,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(date)
+);
+
+CREATE TABLE IF NOT EXISTS engagement_summary (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    total_channels_monitored INTEGER NOT NULL,
+    total_messages_analyzed INTEGER NOT NULL,
+    overall_avg_sentiment REAL NOT NULL,
+    overall_avg_engagement REAL NOT NULL,
+    sentiment_distribution BLOB DEFAULT '{}',
+    most_active_channel TEXT DEFAULT '',
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(date)
+);
+
+-- Indexes match the getters' ORDER BY so range scans come back pre-sorted
+CREATE INDEX IF NOT EXISTS idx_daily_metrics_date_channel ON daily_metrics(date DESC, channel_name);
+CREATE INDEX IF NOT EXISTS idx_daily_metrics_channel ON daily_metrics(channel_name);
+CREATE INDEX IF NOT EXISTS idx_sentiment_trends_date_channel ON sentiment_trends(date DESC, channel_name);
+CREATE INDEX IF NOT EXISTS idx_burnout_alerts_date_score ON burnout_alerts(date DESC, risk_score DESC);
+CREATE INDEX IF NOT EXISTS idx_burnout_alerts_risk ON burnout_alerts(risk_level);
+
+-- Single-column date indexes are covered by the composite ones above
+DROP INDEX IF EXISTS idx_daily_metrics_date;
+DROP INDEX IF EXISTS idx_burnout_alerts_date;
+'''
+
+# Run one at a time inside a transaction, so a failure rolls the whole schema back
+_SCHEMA_STATEMENTS = tuple(statement.strip() for statement in _SCHEMA_SQL.split(';') if statement.strip())
+
+# Per-connection settings; journal_mode is persistent and set once in init_database
+_CONNECTION_PRAGMAS = (
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    # SQLite clamps this to SQLITE_MAX_MMAP_SIZE, and ignores it where mmap is unsupported
+    'PRAGMA mmap_size=1073741824',
+    'PRAGMA cache_size=-131072',
+    'PRAGMA busy_timeout=5000'
+)
+
+_INSERT_DAILY_METRICS = '''
+    INSERT OR REPLACE INTO daily_metrics 
+    (date, channel_name, message_count, avg_sentiment, sentiment_std,
+     emoji_count, reaction_count, active_hours_count, active_hours_mask,
+     thread_participation, engagement_score)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+_INSERT_SENTIMENT_TRENDS = '''
+    INSERT OR REPLACE INTO sentiment_trends 
+    (date, channel_name, sentiment_trend, sentiment_change,
+     engagement_trend, engagement_change, message_trend, message_change,
+     recent_avg_sentiment, recent_avg_engagement)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+_INSERT_BURNOUT_ALERTS = '''
+    INSERT OR REPLACE INTO burnout_alerts 
+    (date, channel_name, risk_level, risk_score, consecutive_negative_days,
+     warning_indicators, recommendations)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+_INSERT_ACTIVITY_PATTERNS = '''
+    INSERT OR REPLACE INTO activity_patterns 
+    (date, peak_hour, peak_day, hourly_distribution, daily_distribution, total_messages)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+_INSERT_ENGAGEMENT_SUMMARY = '''
+    INSERT OR REPLACE INTO engagement_summary 
+    (date, total_channels_monitored, total_messages_analyzed,
+     overall_avg_sentiment, overall_avg_engagement, sentiment_distribution,
+     most_active_channel)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Getter output keys; each query selects these columns in this order
+_DAILY_METRIC_KEYS = (
+    'message_count', 'avg_sentiment', 'sentiment_std', 'emoji_count', 'reaction_count',
+    'active_hours_count', 'active_hours', 'thread_participation', 'engagement_score'
+)
+_BURNOUT_HISTORY_KEYS = (
+    'date', 'channel_name', 'risk_level', 'risk_score', 'consecutive_negative_days',
+    'warning_indicators', 'recommendations'
+)
+_SENTIMENT_TREND_KEYS = (
+    'date', 'sentiment_trend', 'sentiment_change', 'engagement_trend', 'engagement_change',
+    'recent_avg_sentiment', 'recent_avg_engagement'
+)
+
+# Getter queries, with and without the optional channel filter
+_DAILY_METRIC_COLUMNS = ', '.join(
+    'active_hours_mask' if key == 'active_hours' else key for key in _DAILY_METRIC_KEYS
+)
+_SELECT_DAILY_METRICS = f"SELECT channel_name, date, {_DAILY_METRIC_COLUMNS} FROM daily_metrics WHERE date >= ?"
+_SELECT_DAILY_METRICS_FOR_CHANNEL = _SELECT_DAILY_METRICS + ' AND channel_name = ? ORDER BY date DESC, channel_name'
+_SELECT_DAILY_METRICS += ' ORDER BY date DESC, channel_name'
+
+_SELECT_BURNOUT_HISTORY = f"SELECT {', '.join(_BURNOUT_HISTORY_KEYS)} FROM burnout_alerts WHERE date >= ? AND risk_level != 'low'"
+_SELECT_BURNOUT_HISTORY_FOR_CHANNEL = _SELECT_BURNOUT_HISTORY + ' AND channel_name = ? ORDER BY date DESC, risk_score DESC'
+_SELECT_BURNOUT_HISTORY += ' ORDER BY date DESC, risk_score DESC'
+
+_SELECT_SENTIMENT_TRENDS = f"SELECT channel_name, {', '.join(_SENTIMENT_TREND_KEYS)} FROM sentiment_trends WHERE date >= ?"
+_SELECT_SENTIMENT_TRENDS_FOR_CHANNEL = _SELECT_SENTIMENT_TRENDS + ' AND channel_name = ? ORDER BY date DESC, channel_name'
+_SELECT_SENTIMENT_TRENDS += ' ORDER BY date DESC, channel_name'
+
+_CLEANUP_STMTS = tuple(f'DELETE FROM {table} WHERE date < ?' for table in _TABLES)
+
+# All stats in one round trip: a count per table, then date range and channel count
+_SELECT_DATABASE_STATS = 'SELECT ' + ', '.join(
+    [f'(SELECT COUNT(*) FROM {table})' for table in _TABLES] + [
+        '(SELECT MIN(date) FROM daily_metrics)',
+        '(SELECT MAX(date) FROM daily_metrics)',
+        '(SELECT COUNT(DISTINCT channel_name) FROM daily_metrics)'
+    ]
+)
+
+# Columns holding orjson-encoded BLOBs
+_JSON_COLUMNS = frozenset((
+    'warning_indicators', 'recommendations',
+    'hourly_distribution', 'daily_distribution', 'sentiment_distribution'
+))
+
+# Incremental vacuum thresholds, in pages
+_VACUUM_MIN_FREE_PAGES = 1000
+_VACUUM_BATCH_PAGES = 1000
+
+def _configure(conn: sqlite3.Connection) -> sqlite3.Connection:
+    for pragma in _CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+def _pack(value: Any) -> bytes:
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+def _unpack(blob, default: Any) -> Any:
+    # Rows written before the BLOB switch hold JSON text, which orjson also parses
+    return orjson.loads(blob) if blob else default
+
+def _hours_to_mask(hours) -> int:
+    # Active hours are 0-23, so a set of them fits in one integer
+    mask = 0
+    for hour in hours:
+        mask |= 1 << hour
+    return mask
+
+def _mask_to_hours(mask: int) -> List[int]:
+    return [hour for hour in range(24) if mask >> hour & 1] if mask else []
+
 class DataStorage:
     def __init__(self, db_path: str, retention_days: int = 30):
         self.db_path = Path(db_path)
@@ -14,140 +237,128 @@ class DataStorage:
         # Ensure database directory exists
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         
+        # One shared connection in autocommit mode; transactions are explicit.
+        # The lock is reentrant so store_* calls can run inside transaction()
+        self._conn = self._connect()
+        self._lock = threading.RLock()
+        
         # Initialize database
         self.init_database()
     
-    def init_database(self):
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS daily_metrics (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date TEXT NOT NULL,
-                    channel_name TEXT NOT NULL,
-                    message_count INTEGER NOT NULL,
-                    avg_sentiment REAL NOT NULL,
-                    sentiment_std REAL DEFAULT 0.0,
-                    emoji_count INTEGER DEFAULT 0,
-                    reaction_count INTEGER DEFAULT 0,
-                    active_hours_count INTEGER DEFAULT 0,
-                    active_hours TEXT DEFAULT '',
-                    thread_participation REAL DEFAULT 0.0,
-                    engagement_score REAL DEFAULT 0.0,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(date, channel_name)
-                )
-            ''')
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, isolation_level=None, cached_statements=256
+        )
+        conn.row_factory = sqlite3.Row
+        return _configure(conn)
+    
+    @contextmanager
+    def transaction(self):
+        # Group several writes into one commit; nested use becomes a savepoint
+        with self._lock:
+            conn = self._conn
+            if conn.in_transaction:
+                conn.execute('SAVEPOINT nested_write')
+                try:
+                    yield conn
+                except Exception:
+                    conn.execute('ROLLBACK TO nested_write')
+                    conn.execute('RELEASE nested_write')
+                    raise
+                conn.execute('RELEASE nested_write')
+                return
             
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS sentiment_trends (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date TEXT NOT NULL,
-                    channel_name TEXT NOT NULL,
-                    sentiment_trend TEXT NOT NULL,
-                    sentiment_change REAL DEFAULT 0.0,
-                    engagement_trend TEXT NOT NULL,
-                    engagement_change REAL DEFAULT 0.0,
-                    message_trend TEXT NOT NULL,
-                    message_change REAL DEFAULT 0.0,
-                    recent_avg_sentiment REAL DEFAULT 0.0,
-                    recent_avg_engagement REAL DEFAULT 0.0,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(date, channel_name)
-                )
-            ''')
+            conn.execute('BEGIN')
+            try:
+                yield conn
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+    
+    def init_database(self):
+        with self._lock:
+            for pragma in _SCHEMA_PRAGMAS:
+                self._conn.execute(pragma)
             
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS burnout_alerts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date TEXT NOT NULL,
-                    channel_name TEXT NOT NULL,
-                    risk_level TEXT NOT NULL,
-                    risk_score REAL NOT NULL,
-                    consecutive_negative_days INTEGER DEFAULT 0,
-                    warning_indicators TEXT DEFAULT '',
-                    recommendations TEXT DEFAULT '',
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(date, channel_name)
-                )
-            ''')
+            # Databases created without auto_vacuum keep reporting NONE until rebuilt
+            if self._conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 0:
+                self.logger.info("Rebuilding database once to enable incremental auto-vacuum")
+                self._conn.execute('VACUUM')
             
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS activity_patterns (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date TEXT NOT NULL,
-                    peak_hour INTEGER DEFAULT 12,
-                    peak_day TEXT DEFAULT 'Monday',
-                    hourly_distribution TEXT DEFAULT '{}',
-                    daily_distribution TEXT DEFAULT '{}',
-                    total_messages INTEGER DEFAULT 0,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(date)
-                )
-            ''')
+            with self.transaction() as conn:
+                for statement in _SCHEMA_STATEMENTS:
+                    conn.execute(statement)
             
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS engagement_summary (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date TEXT NOT NULL,
-                    total_channels_monitored INTEGER NOT NULL,
-                    total_messages_analyzed INTEGER NOT NULL,
-                    overall_avg_sentiment REAL NOT NULL,
-                    overall_avg_engagement REAL NOT NULL,
-                    sentiment_distribution TEXT DEFAULT '{}',
-                    most_active_channel TEXT DEFAULT '',
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(date)
-                )
-            ''')
+            self._migrate_active_hours(self._conn)
+    
+    def _migrate_active_hours(self, conn: sqlite3.Connection):
+        # Older databases store active hours as an encoded list; move them to the bitmask column
+        columns = {column['name'] for column in conn.execute('PRAGMA table_info(daily_metrics)')}
+        if 'active_hours' not in columns:
+            return
+        
+        # Already migrated on a SQLite version that could not drop the old column
+        if 'active_hours_mask' in columns and sqlite3.sqlite_version_info < (3, 35, 0):
+            return
+        
+        conn.execute('BEGIN')
+        try:
+            if 'active_hours_mask' not in columns:
+                conn.execute('ALTER TABLE daily_metrics ADD COLUMN active_hours_mask INTEGER DEFAULT 0')
             
-            # Create indexes for better query performance
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_daily_metrics_date ON daily_metrics(date)')
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_daily_metrics_channel ON daily_metrics(channel_name)')
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_burnout_alerts_date ON burnout_alerts(date)')
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_burnout_alerts_risk ON burnout_alerts(risk_level)')
+            rows = [
+                (_hours_to_mask(_unpack(active_hours, [])), row_id)
+                for row_id, active_hours in conn.execute('SELECT id, active_hours FROM daily_metrics')
+                if active_hours
+            ]
+            conn.executemany('UPDATE daily_metrics SET active_hours_mask = ? WHERE id = ?', rows)
             
-            conn.commit()
+            # DROP COLUMN needs SQLite 3.35+; older versions keep the unused column
+            if sqlite3.sqlite_version_info >= (3, 35, 0):
+                conn.execute('ALTER TABLE daily_metrics DROP COLUMN active_hours')
+            else:
+                conn.execute("UPDATE daily_metrics SET active_hours = ''")
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        
+        self.logger.info(f"Migrated active hours for {len(rows)} daily metric rows to bitmasks")
     
     def store_daily_metrics(self, date: str, daily_metrics: Dict[str, Dict]):
-        with sqlite3.connect(self.db_path) as conn:
-            for channel_name, channel_data in daily_metrics.items():
-                for day_date, metrics in channel_data.items():
-                    try:
-                        conn.execute('''
-                            INSERT OR REPLACE INTO daily_metrics 
-                            (date, channel_name, message_count, avg_sentiment, sentiment_std,
-                             emoji_count, reaction_count, active_hours_count, active_hours,
-                             thread_participation, engagement_score)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        ''', (
-                            day_date,
-                            channel_name,
-                            metrics['message_count'],
-                            metrics['avg_sentiment'],
-                            metrics['sentiment_std'],
-                            metrics['emoji_count'],
-                            metrics['reaction_count'],
-                            metrics['active_hours_count'],
-                            json.dumps(metrics['active_hours']),
-                            metrics['thread_participation'],
-                            metrics['engagement_score']
-                        ))
-                    except Exception as e:
-                        self.logger.error(f"Error storing daily metrics for {channel_name} on {day_date}: {e}")
-            
-            conn.commit()
+        with self._lock:
+            conn = self._conn
+            try:
+                rows = [
+                    (
+                        day_date,
+                        channel_name,
+                        metrics['message_count'],
+                        metrics['avg_sentiment'],
+                        metrics['sentiment_std'],
+                        metrics['emoji_count'],
+                        metrics['reaction_count'],
+                        metrics['active_hours_count'],
+                        _hours_to_mask(metrics['active_hours']),
+                        metrics['thread_participation'],
+                        metrics['engagement_score']
+                    )
+                    for channel_name, channel_data in daily_metrics.items()
+                    for day_date, metrics in channel_data.items()
+                ]
+                
+                with self.transaction():
+                    conn.executemany(_INSERT_DAILY_METRICS, rows)
+            except Exception as e:
+                self.logger.error(f"Error storing daily metrics: {e}")
     
     def store_sentiment_trends(self, date: str, trends: Dict[str, Any]):
-        with sqlite3.connect(self.db_path) as conn:
-            for channel_name, trend_data in trends.items():
-                try:
-                    conn.execute('''
-                        INSERT OR REPLACE INTO sentiment_trends 
-                        (date, channel_name, sentiment_trend, sentiment_change,
-                         engagement_trend, engagement_change, message_trend, message_change,
-                         recent_avg_sentiment, recent_avg_engagement)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
+        with self._lock:
+            conn = self._conn
+            try:
+                rows = [
+                    (
                         date,
                         channel_name,
                         trend_data.get('sentiment_trend', 'stable'),
@@ -158,214 +369,144 @@ class DataStorage:
                         trend_data.get('message_change', 0.0),
                         trend_data.get('recent_avg_sentiment', 0.0),
                         trend_data.get('recent_avg_engagement', 0.0)
-                    ))
-                except Exception as e:
-                    self.logger.error(f"Error storing sentiment trends for {channel_name}: {e}")
-            
-            conn.commit()
+                    )
+                    for channel_name, trend_data in trends.items()
+                ]
+                
+                with self.transaction():
+                    conn.executemany(_INSERT_SENTIMENT_TRENDS, rows)
+            except Exception as e:
+                self.logger.error(f"Error storing sentiment trends: {e}")
     
     def store_burnout_alerts(self, date: str, alerts: Dict[str, Any]):
-        with sqlite3.connect(self.db_path) as conn:
-            for channel_name, alert_data in alerts.items():
-                try:
-                    conn.execute('''
-                        INSERT OR REPLACE INTO burnout_alerts 
-                        (date, channel_name, risk_level, risk_score, consecutive_negative_days,
-                         warning_indicators, recommendations)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    ''', (
+        with self._lock:
+            conn = self._conn
+            try:
+                rows = [
+                    (
                         date,
                         channel_name,
-                        alert_data.get('risk_level', 'low'),
+                        str(alert_data.get('risk_level', 'low')),
                         alert_data.get('risk_score', 0.0),
                         alert_data.get('consecutive_negative_days', 0),
-                        json.dumps(alert_data.get('warning_indicators', [])),
-                        json.dumps(alert_data.get('recommendations', []))
-                    ))
-                except Exception as e:
-                    self.logger.error(f"Error storing burnout alerts for {channel_name}: {e}")
-            
-            conn.commit()
+                        _pack(alert_data.get('warning_indicators', [])),
+                        _pack(alert_data.get('recommendations', []))
+                    )
+                    for channel_name, alert_data in alerts.items()
+                ]
+                
+                with self.transaction():
+                    conn.executemany(_INSERT_BURNOUT_ALERTS, rows)
+            except Exception as e:
+                self.logger.error(f"Error storing burnout alerts: {e}")
     
     def store_activity_patterns(self, date: str, patterns: Dict[str, Any]):
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock:
+            conn = self._conn
             try:
-                conn.execute('''
-                    INSERT OR REPLACE INTO activity_patterns 
-                    (date, peak_hour, peak_day, hourly_distribution, daily_distribution, total_messages)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
-                    date,
-                    patterns.get('peak_hour', 12),
-                    patterns.get('peak_day', 'Monday'),
-                    json.dumps(patterns.get('hourly_distribution', {})),
-                    json.dumps(patterns.get('daily_distribution', {})),
-                    patterns.get('total_messages', 0)
-                ))
-                conn.commit()
+                with self.transaction():
+                    conn.execute(_INSERT_ACTIVITY_PATTERNS, (
+                        date,
+                        patterns.get('peak_hour', 12),
+                        patterns.get('peak_day', 'Monday'),
+                        _pack(patterns.get('hourly_distribution', {})),
+                        _pack(patterns.get('daily_distribution', {})),
+                        patterns.get('total_messages', 0)
+                    ))
             except Exception as e:
                 self.logger.error(f"Error storing activity patterns: {e}")
     
     def store_engagement_summary(self, date: str, summary: Dict[str, Any]):
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock:
+            conn = self._conn
             try:
-                conn.execute('''
-                    INSERT OR REPLACE INTO engagement_summary 
-                    (date, total_channels_monitored, total_messages_analyzed,
-                     overall_avg_sentiment, overall_avg_engagement, sentiment_distribution,
-                     most_active_channel)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    date,
-                    summary.get('total_channels_monitored', 0),
-                    summary.get('total_messages_analyzed', 0),
-                    summary.get('overall_avg_sentiment', 0.0),
-                    summary.get('overall_avg_engagement', 0.0),
-                    json.dumps(summary.get('sentiment_distribution', {})),
-                    summary.get('most_active_channel', '')
-                ))
-                conn.commit()
+                with self.transaction():
+                    conn.execute(_INSERT_ENGAGEMENT_SUMMARY, (
+                        date,
+                        summary.get('total_channels_monitored', 0),
+                        summary.get('total_messages_analyzed', 0),
+                        summary.get('overall_avg_sentiment', 0.0),
+                        summary.get('overall_avg_engagement', 0.0),
+                        _pack(summary.get('sentiment_distribution', {})),
+                        summary.get('most_active_channel', '')
+                    ))
             except Exception as e:
                 self.logger.error(f"Error storing engagement summary: {e}")
     
     def get_daily_metrics(self, channel_name: str = None, days_back: int = 7) -> Dict[str, Any]:
         start_date = (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d')
         
-        query = '''
-            SELECT * FROM daily_metrics 
-            WHERE date >= ?
-        '''
-        params = [start_date]
-        
         if channel_name:
-            query += ' AND channel_name = ?'
-            params.append(channel_name)
-        
-        query += ' ORDER BY date DESC, channel_name'
-        
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute(query, params)
-            rows = cursor.fetchall()
+            query, params = _SELECT_DAILY_METRICS_FOR_CHANNEL, (start_date, channel_name)
+        else:
+            query, params = _SELECT_DAILY_METRICS, (start_date,)
         
-        # Convert to nested dict structure
+        # Convert to nested dict structure while iterating the cursor
         result = {}
-        for row in rows:
-            channel = row['channel_name']
-            date = row['date']
-            
-            if channel not in result:
-                result[channel] = {}
-            
-            result[channel][date] = {
-                'message_count': row['message_count'],
-                'avg_sentiment': row['avg_sentiment'],
-                'sentiment_std': row['sentiment_std'],
-                'emoji_count': row['emoji_count'],
-                'reaction_count': row['reaction_count'],
-                'active_hours_count': row['active_hours_count'],
-                'active_hours': json.loads(row['active_hours'] or '[]'),
-                'thread_participation': row['thread_participation'],
-                'engagement_score': row['engagement_score']
-            }
+        with self._lock:
+            for row in self._conn.execute(query, params):
+                channel, date = row[0], row[1]
+                
+                if channel not in result:
+                    result[channel] = {}
+                
+                metrics = dict(zip(_DAILY_METRIC_KEYS, row[2:]))
+                metrics['active_hours'] = _mask_to_hours(metrics['active_hours'])
+                result[channel][date] = metrics
         
         return result
     
     def get_burnout_history(self, channel_name: str = None, days_back: int = 30) -> List[Dict[str, Any]]:
         start_date = (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d')
         
-        query = '''
-            SELECT * FROM burnout_alerts 
-            WHERE date >= ? AND risk_level != 'low'
-        '''
-        params = [start_date]
-        
         if channel_name:
-            query += ' AND channel_name = ?'
-            params.append(channel_name)
-        
-        query += ' ORDER BY date DESC, risk_score DESC'
+            query, params = _SELECT_BURNOUT_HISTORY_FOR_CHANNEL, (start_date, channel_name)
+        else:
+            query, params = _SELECT_BURNOUT_HISTORY, (start_date,)
         
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute(query, params)
-            rows = cursor.fetchall()
+        with self._lock:
+            result = [dict(zip(_BURNOUT_HISTORY_KEYS, row)) for row in self._conn.execute(query, params)]
         
-        result = []
-        for row in rows:
-            result.append({
-                'date': row['date'],
-                'channel_name': row['channel_name'],
-                'risk_level': row['risk_level'],
-                'risk_score': row['risk_score'],
-                'consecutive_negative_days': row['consecutive_negative_days'],
-                'warning_indicators': json.loads(row['warning_indicators'] or '[]'),
-                'recommendations': json.loads(row['recommendations'] or '[]')
-            })
+        for alert in result:
+            alert['warning_indicators'] = _unpack(alert['warning_indicators'], [])
+            alert['recommendations'] = _unpack(alert['recommendations'], [])
         
         return result
     
     def get_sentiment_trends_history(self, channel_name: str = None, days_back: int = 14) -> Dict[str, List[Dict[str, Any]]]:
         start_date = (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d')
         
-        query = '''
-            SELECT * FROM sentiment_trends 
-            WHERE date >= ?
-        '''
-        params = [start_date]
-        
         if channel_name:
-            query += ' AND channel_name = ?'
-            params.append(channel_name)
-        
-        query += ' ORDER BY date DESC, channel_name'
-        
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute(query, params)
-            rows = cursor.fetchall()
+            query, params = _SELECT_SENTIMENT_TRENDS_FOR_CHANNEL, (start_date, channel_name)
+        else:
+            query, params = _SELECT_SENTIMENT_TRENDS, (start_date,)
         
         result = {}
-        for row in rows:
-            channel = row['channel_name']
-            
-            if channel not in result:
-                result[channel] = []
-            
-            result[channel].append({
-                'date': row['date'],
-                'sentiment_trend': row['sentiment_trend'],
-                'sentiment_change': row['sentiment_change'],
-                'engagement_trend': row['engagement_trend'],
-                'engagement_change': row['engagement_change'],
-                'recent_avg_sentiment': row['recent_avg_sentiment'],
-                'recent_avg_engagement': row['recent_avg_engagement']
-            })
+        with self._lock:
+            for row in self._conn.execute(query, params):
+                channel = row[0]
+                
+                if channel not in result:
+                    result[channel] = []
+                
+                result[channel].append(dict(zip(_SENTIMENT_TREND_KEYS, row[1:])))
         
         return result
     
     def get_database_stats(self) -> Dict[str, Any]:
-        with sqlite3.connect(self.db_path) as conn:
-            stats = {}
-            
-            # Count records in each table
-            tables = ['daily_metrics', 'sentiment_trends', 'burnout_alerts', 'activity_patterns', 'engagement_summary']
-            
-            for table in tables:
-                cursor = conn.execute(f'SELECT COUNT(*) FROM {table}')
-                stats[f'{table}_count'] = cursor.fetchone()[0]
-            
-            # Date ranges
-            cursor = conn.execute('SELECT MIN(date), MAX(date) FROM daily_metrics')
-            min_date, max_date = cursor.fetchone()
-            stats['data_date_range'] = {'start': min_date, 'end': max_date}
-            
-            # Channel count
-            cursor = conn.execute('SELECT COUNT(DISTINCT channel_name) FROM daily_metrics')
-            stats['unique_channels'] = cursor.fetchone()[0]
-            
-            # Database size
-            stats['database_size_mb'] = self.db_path.stat().st_size / (1024 * 1024) if self.db_path.exists() else 0
+        with self._lock:
+            row = self._conn.execute(_SELECT_DATABASE_STATS).fetchone()
+        
+        # Count records in each table
+        stats = {f'{table}_count': count for table, count in zip(_TABLES, row)}
+        
+        # Date ranges and channel count
+        min_date, max_date, unique_channels = row[len(_TABLES):]
+        stats['data_date_range'] = {'start': min_date, 'end': max_date}
+        stats['unique_channels'] = unique_channels
+        
+        # Database size
+        stats['database_size_mb'] = self.db_path.stat().st_size / (1024 * 1024) if self.db_path.exists() else 0
         
         return stats
     
@@ -373,17 +514,37 @@ class DataStorage:
         cutoff_date = (datetime.now() - timedelta(days=self.retention_days)).strftime('%Y-%m-%d')
         deleted_count = 0
         
-        tables = ['daily_metrics', 'sentiment_trends', 'burnout_alerts', 'activity_patterns', 'engagement_summary']
-        
-        with sqlite3.connect(self.db_path) as conn:
-            for table in tables:
-                cursor = conn.execute(f'DELETE FROM {table} WHERE date < ?', (cutoff_date,))
-                deleted_count += cursor.rowcount
-                self.logger.info(f"Cleaned up {cursor.rowcount} old records from {table}")
+        with self._lock:
+            conn = self._conn
+            
+            # One write transaction, and a single commit, for all tables
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                for table, statement in zip(_TABLES, _CLEANUP_STMTS):
+                    cursor = conn.execute(statement, (cutoff_date,))
+                    deleted_count += cursor.rowcount
+                    self.logger.info(f"Cleaned up {cursor.rowcount} old records from {table}")
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+            
+            # Row counts just changed in bulk, so rebuild the planner statistics
+            conn.execute('ANALYZE')
             
-            # Vacuum to reclaim space
-            conn.execute('VACUUM')
-            conn.commit()
+            # Free pages are reused by later inserts; only reclaim them in
+            # bounded steps once enough of the file is free
+            freelist_count = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+            if freelist_count > max(_VACUUM_MIN_FREE_PAGES, page_count // 10):
+                batches = -(-freelist_count // _VACUUM_BATCH_PAGES)
+                for batch in range(1, batches + 1):
+                    # executescript steps the pragma to completion; execute() frees a single page
+                    conn.executescript(f'PRAGMA incremental_vacuum({_VACUUM_BATCH_PAGES})')
+                    if batch % 4 == 0:
+                        conn.execute('PRAGMA wal_checkpoint(PASSIVE)').fetchall()
+                
+                self.logger.info(f"Reclaimed up to {freelist_count} free pages")
         
         self.logger.info(f"Cleanup completed: removed {deleted_count} old records")
         return deleted_count
@@ -391,27 +552,53 @@ class DataStorage:
     def export_data(self, output_path: str, format_type: str = 'json', days_back: int = 30):
         output_path = Path(output_path)
         
-        # Get all data
-        daily_metrics = self.get_daily_metrics(days_back=days_back)
-        burnout_history = self.get_burnout_history(days_back=days_back)
-        trends_history = self.get_sentiment_trends_history(days_back=days_back)
-        
-        export_data = {
-            'export_timestamp': datetime.now().isoformat(),
-            'days_back': days_back,
-            'daily_metrics': daily_metrics,
-            'burnout_history': burnout_history,
-            'sentiment_trends_history': trends_history,
-            'database_stats': self.get_database_stats()
-        }
-        
-        if format_type == 'json':
-            with open(output_path, 'w') as f:
-                json.dump(export_data, f, indent=2, default=str)
+        if format_type == 'csv.gz':
+            start_date = (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d')
+            self._export_csv_gz(output_path, start_date)
+        elif format_type == 'json':
+            # Get all data
+            daily_metrics = self.get_daily_metrics(days_back=days_back)
+            burnout_history = self.get_burnout_history(days_back=days_back)
+            trends_history = self.get_sentiment_trends_history(days_back=days_back)
+            
+            export_data = {
+                'export_timestamp': datetime.now().isoformat(),
+                'days_back': days_back,
+                'daily_metrics': daily_metrics,
+                'burnout_history': burnout_history,
+                'sentiment_trends_history': trends_history,
+                'database_stats': self.get_database_stats()
+            }
+            
+            output_path.write_bytes(orjson.dumps(
+                export_data,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+                default=str
+            ))
         else:
             raise ValueError(f"Unsupported export format: {format_type}")
         
         self.logger.info(f"Data exported to {output_path}")
     
+    def _export_csv_gz(self, output_path: Path, start_date: str):
+        # Rows go from the cursor straight to the writer; each table is written as a
+        # block of its name, a header row and the rows, followed by a blank line
+        with self._lock, gzip.open(output_path, 'wt', newline='') as f:
+            writer = csv.writer(f)
+            for table in _TABLES:
+                columns = [column['name'] for column in self._conn.execute(f'PRAGMA table_info({table})')]
+                select_list = ', '.join(
+                    f'CAST({column} AS TEXT) AS {column}' if column in _JSON_COLUMNS else column
+                    for column in columns
+                )
+                
+                writer.writerow([table])
+                writer.writerow(columns)
+                writer.writerows(self._conn.execute(f'SELECT {select_list} FROM {table} WHERE date >= ?', (start_date,)))
+                writer.writerow([])
+    
     def close(self):
-        pass
\ No newline at end of file
+        with self._lock:
+            # Refresh planner statistics for any tables that need it
+            self._conn.execute('PRAGMA optimize')
+            self._conn.close()
\ No newline at end of file
@@ -1,19 +1,78 @@
 #!/usr/bin/env python3
 
 import logging
+import multiprocessing
+import os
+import queue
+import threading
+from logging.handlers import RotatingFileHandler
 import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 import traceback
 from pathlib import Path
 
+import orjson
+
 from config_manager import ConfigManager
 from slack_data_collector import SlackDataCollector
 from sentiment_analyzer import SentimentAnalyzer
-from engagement_tracker import EngagementTracker
-from burnout_detector import BurnoutDetector
+from engagement_tracker import EngagementTracker, MessageColumns, MessageSentiment
+from burnout_detector import BurnoutDetector, RiskLevel
 from report_generator import ReportGenerator
 from data_storage import DataStorage
+from analysis_cache import AnalysisCache
+
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+
+# Channels fetched ahead of the one being analyzed
+CHANNEL_PREFETCH = 2
+
+# Below this many messages a process pool costs more than it saves
+PARALLEL_SENTIMENT_MIN_MESSAGES = 500
+SENTIMENT_CHUNK_SIZE = 256
+
+def analyze_message_items(sentiment_analyzer: SentimentAnalyzer,
+                          items: List[Tuple[Optional[str], Optional[List[Dict]]]]) -> List[Optional[MessageSentiment]]:
+    # Texts are scored as one batch so the GPT path can pack many messages per request
+    has_text = [bool(text and text.strip()) for text, _ in items]
+    text_sentiments = iter(sentiment_analyzer.analyze_messages_sentiment(
+        [text for (text, _), scored in zip(items, has_text) if scored]
+    ))
+    analyze_reactions = sentiment_analyzer.analyze_reaction_sentiment
+    
+    results = []
+    append = results.append
+    for (text, reactions), scored in zip(items, has_text):
+        sentiment = next(text_sentiments) if scored else None
+        
+        # Analyze reactions
+        if reactions:
+            if sentiment is None:
+                sentiment = {}
+            sentiment.update(analyze_reactions(reactions))
+        
+        # Keep only the scores the tracker reads; the full analyzer dict is dropped here
+        append(MessageSentiment.from_dict(sentiment) if sentiment is not None else None)
+    
+    return results
+
+def _gevent_patched() -> bool:
+    monkey = sys.modules.get('gevent.monkey')
+    return monkey is not None and monkey.is_module_patched('threading')
+
+# Each pool worker builds its own analyzer once; the VADER lexicon is not shipped per task
+_worker_sentiment_analyzer = None
+
+def _init_sentiment_worker():
+    global _worker_sentiment_analyzer
+    _worker_sentiment_analyzer = SentimentAnalyzer(use_gpt=False)
+
+def _analyze_chunk_in_worker(items: List[Tuple[Optional[str], Optional[List[Dict]]]]) -> List[Optional[MessageSentiment]]:
+    return analyze_message_items(_worker_sentiment_analyzer, items)
 
 class EngagementAnalyzer:
     def __init__(self, config_file: str = "config.json"):
@@ -30,10 +89,14 @@ class EngagementAnalyzer:
         try:
             self.slack_collector = SlackDataCollector(
                 token=self.config.get_slack_token(),
-                rate_limit_delay=self.config.get_rate_limit_delay()
+                rate_limit_delay=self.config.get_rate_limit_delay(),
+                cache_dir=self.config.get_cache_directory(),
+                channel_cache_ttl=self.config.get_channel_cache_ttl()
             )
             
-            self.sentiment_analyzer = SentimentAnalyzer()
+            self.sentiment_analyzer = SentimentAnalyzer(
+                gpt_cache_path=str(Path(self.config.get_cache_directory()) / 'gpt_sentiment.db')
+            )
             self.engagement_tracker = EngagementTracker()
             
             self.burnout_detector = BurnoutDetector(
@@ -51,6 +114,11 @@ class EngagementAnalyzer:
                 retention_days=self.config.get_database_retention_days()
             )
             
+            self.analysis_cache = AnalysisCache(
+                cache_dir=self.config.get_cache_directory(),
+                ttl_seconds=self.config.get_analysis_cache_ttl()
+            )
+            
             self.logger.info("All components initialized successfully")
             
         except Exception as e:
@@ -61,19 +129,21 @@ class EngagementAnalyzer:
         log_config = self.config.get_logging_config()
         log_level = getattr(logging, log_config.get('level', 'INFO').upper())
         
-        # Create logs directory if specified
-        if 'file' in log_config:
-            log_file = Path(log_config['file'])
-            log_file.parent.mkdir(parents=True, exist_ok=True)
+        handlers = [logging.StreamHandler(sys.stdout)]
+        
+        # Rotate the log file if one is configured; it is only opened on the first record
+        log_file = log_config.get('file')
+        if log_file:
+            Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+            handlers.append(RotatingFileHandler(
+                log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, delay=True
+            ))
         
         # Configure logging
         logging.basicConfig(
             level=log_level,
             format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.StreamHandler(sys.stdout),
-                logging.FileHandler(log_config.get('file', 'engagement.log'))
-            ] if 'file' in log_config else [logging.StreamHandler(sys.stdout)]
+            handlers=handlers
         )
     
     def test_slack_connection(self) -> bool:
@@ -93,55 +163,58 @@ class EngagementAnalyzer:
         if days_back is None:
             days_back = self.config.get_analysis_days()
         
-        self.logger.info(f"Starting data collection for {days_back} days")
-        
         try:
-            # 1. Collect data from Slack
+            # Reuse a recent same-day run for the same channels, window and settings;
+            # the full config is part of the key so update_config never serves a stale result
             monitored_channels = self.config.get_monitored_channels()
+            cache_key = self.analysis_cache.make_key(
+                channels=sorted(monitored_channels),
+                days=days_back,
+                date=datetime.now().strftime('%Y-%m-%d'),
+                config=self.config.get_full_config(),
+                use_gpt=self.sentiment_analyzer.use_gpt
+            )
+            cached = self.analysis_cache.get(cache_key)
+            if cached is not None:
+                self.logger.info(f"Using cached analysis for {days_back} days")
+                return cached
+            
+            self.logger.info(f"Starting data collection for {days_back} days")
+            
+            # 1-4. Collect channels on a background thread while the ones already
+            # fetched are scored and folded into metric columns
             self.logger.info(f"Monitoring channels: {monitored_channels}")
+            channel_data = {}
+            columns = MessageColumns()
             
-            channel_data = self.slack_collector.collect_channel_data(
-                channel_names=monitored_channels,
-                days_back=days_back
-            )
+            sentiment_pool = self.create_sentiment_pool()
+            with sentiment_pool or nullcontext():
+                for channel_name, messages in self.stream_channel_data(monitored_channels, days_back):
+                    channel_data[channel_name] = messages
+                    
+                    self.logger.info(f"Analyzing sentiment for {channel_name}...")
+                    sentiments = self.analyze_sentiments(
+                        [(message.get('text'), message.get('reactions')) for message in messages],
+                        sentiment_pool
+                    )
+                    self.engagement_tracker.ingest_channel(channel_name, messages, columns, sentiments)
             
             if not channel_data:
                 self.logger.warning("No data collected from Slack channels")
                 return {}
             
-            # 2. Analyze sentiment for all messages
-            self.logger.info("Analyzing sentiment...")
-            for channel_name, messages in channel_data.items():
-                for message in messages:
-                    if 'text' in message and message['text'].strip():
-                        sentiment_data = self.sentiment_analyzer.analyze_message_sentiment(
-                            message['text']
-                        )
-                        message['sentiment'] = sentiment_data
-                    
-                    # Analyze reactions
-                    if 'reactions' in message and message['reactions']:
-                        reaction_sentiment = self.sentiment_analyzer.analyze_reaction_sentiment(
-                            message['reactions']
-                        )
-                        if 'sentiment' not in message:
-                            message['sentiment'] = {}
-                        message['sentiment'].update(reaction_sentiment)
-            
-            # 3. Calculate engagement metrics
-            self.logger.info("Calculating engagement metrics...")
-            daily_metrics = self.engagement_tracker.calculate_daily_metrics(channel_data)
-            
-            # 4. Analyze activity patterns
-            self.logger.info("Analyzing activity patterns...")
-            activity_patterns = self.engagement_tracker.analyze_peak_activity_patterns(channel_data)
+            self.logger.info("Calculating engagement metrics and activity patterns...")
+            daily_table, activity_patterns = self.engagement_tracker.analyze_activity(columns)
             
             # 5. Calculate engagement trends
             self.logger.info("Calculating engagement trends...")
-            engagement_trends = self.engagement_tracker.calculate_engagement_trends(daily_metrics, days_back)
+            engagement_trends = self.engagement_tracker.calculate_engagement_trends(daily_table, days_back)
             
             # 6. Generate engagement summary
-            engagement_summary = self.engagement_tracker.get_engagement_summary(daily_metrics)
+            engagement_summary = self.engagement_tracker.get_engagement_summary(daily_table)
+            
+            # Nested dict view for the detector, storage and reports
+            daily_metrics = daily_table.to_nested_dict()
             
             # 7. Detect burnout patterns
             self.logger.info("Detecting burnout patterns...")
@@ -153,14 +226,15 @@ class EngagementAnalyzer:
             self.logger.info("Storing data...")
             date_str = datetime.now().strftime('%Y-%m-%d')
             
-            self.data_storage.store_daily_metrics(date_str, daily_metrics)
-            self.data_storage.store_sentiment_trends(date_str, engagement_trends)
-            self.data_storage.store_burnout_alerts(date_str, burnout_alerts)
-            self.data_storage.store_activity_patterns(date_str, activity_patterns)
-            self.data_storage.store_engagement_summary(date_str, engagement_summary)
+            # One transaction and a single commit for the whole run
+            with self.data_storage.transaction():
+                self.data_storage.store_daily_metrics(date_str, daily_metrics)
+                self.data_storage.store_sentiment_trends(date_str, engagement_trends)
+                self.data_storage.store_burnout_alerts(date_str, burnout_alerts)
+                self.data_storage.store_activity_patterns(date_str, activity_patterns)
+                self.data_storage.store_engagement_summary(date_str, engagement_summary)
             
-            # Return analysis results
-            return {
+            analysis_data = {
                 'daily_metrics': daily_metrics,
                 'engagement_trends': engagement_trends,
                 'burnout_alerts': burnout_alerts,
@@ -174,11 +248,80 @@ class EngagementAnalyzer:
                 }
             }
             
+            self.analysis_cache.set(cache_key, analysis_data)
+            
+            # Return analysis results
+            return analysis_data
+            
         except Exception as e:
             self.logger.error(f"Error during data collection and analysis: {e}")
             self.logger.error(traceback.format_exc())
             raise
     
+    def stream_channel_data(self, channel_names, days_back: int) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        # Slack fetches are network-bound; run them ahead of the consumer on their own thread
+        batches = queue.Queue(maxsize=CHANNEL_PREFETCH)
+        stopped = threading.Event()
+        
+        def offer(item) -> bool:
+            # Block while the queue is full, but give up once the consumer has gone away
+            while not stopped.is_set():
+                try:
+                    batches.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def produce():
+            try:
+                for batch in self.slack_collector.iter_channel_data(channel_names=channel_names, days_back=days_back):
+                    if not offer(batch):
+                        return
+            except BaseException as e:
+                offer(e)
+            else:
+                offer(None)
+        
+        threading.Thread(target=produce, name='slack-collector', daemon=True).start()
+        
+        try:
+            while True:
+                batch = batches.get()
+                if batch is None:
+                    return
+                if isinstance(batch, BaseException):
+                    raise batch
+                yield batch
+        finally:
+            stopped.set()
+    
+    def create_sentiment_pool(self) -> Optional[ProcessPoolExecutor]:
+        # GPT scoring is network-bound, so only the local VADER/TextBlob path is spread over processes.
+        # Workers start on first use, so an unused pool costs nothing
+        workers = os.cpu_count() or 1
+        # Under the gevent server the process is monkey-patched; keep sentiment scoring in-process there
+        if self.sentiment_analyzer.use_gpt or workers < 2 or _gevent_patched():
+            return None
+        # Collector threads are already running by now, so forking could copy their held locks into workers
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_sentiment_worker
+        )
+    
+    def analyze_sentiments(self, items: List[Tuple[Optional[str], Optional[List[Dict]]]],
+                           executor: Optional[ProcessPoolExecutor] = None) -> List[Optional[MessageSentiment]]:
+        if executor is None or len(items) < PARALLEL_SENTIMENT_MIN_MESSAGES:
+            return analyze_message_items(self.sentiment_analyzer, items)
+        
+        try:
+            chunks = [items[i:i + SENTIMENT_CHUNK_SIZE] for i in range(0, len(items), SENTIMENT_CHUNK_SIZE)]
+            return [sentiment for chunk in executor.map(_analyze_chunk_in_worker, chunks) for sentiment in chunk]
+        except Exception as e:
+            self.logger.warning(f"Parallel sentiment analysis failed, analyzing sequentially: {e}")
+            return analyze_message_items(self.sentiment_analyzer, items)
+    
     def generate_reports(self, analysis_data: Dict[str, Any]) -> List[str]:
         self.logger.info("Generating reports...")
         report_paths = []
@@ -190,17 +333,26 @@ class EngagementAnalyzer:
                 engagement_trends=analysis_data['engagement_trends'],
                 burnout_alerts=analysis_data['burnout_alerts'],
                 activity_patterns=analysis_data['activity_patterns'],
-                engagement_summary=analysis_data['engagement_summary']
+                engagement_summary=analysis_data['engagement_summary'],
+                include_daily=self.config.get_include_daily_breakdown()
             )
             
             # Save in configured formats
             report_formats = self.config.get_report_formats()
             
-            for format_type in report_formats:
-                if format_type in ['json', 'csv', 'html']:
-                    report_path = self.report_generator.save_report(weekly_report, format_type)
-                    report_paths.append(report_path)
-                    self.logger.info(f"Report saved: {report_path}")
+            formats = [format_type for format_type in report_formats if format_type in ['json', 'csv', 'html']]
+            
+            # Each format writes its own file, so they can be serialized side by side
+            if formats:
+                with ThreadPoolExecutor(max_workers=len(formats)) as executor:
+                    futures = [
+                        executor.submit(self.report_generator.save_report, weekly_report, format_type)
+                        for format_type in formats
+                    ]
+                    for future in futures:
+                        report_path = future.result()
+                        report_paths.append(report_path)
+                        self.logger.info(f"Report saved: {report_path}")
             
             return report_paths
             
@@ -237,8 +389,8 @@ class EngagementAnalyzer:
         if burnout_alerts:
             print(f"\n⚠️  BURNOUT ALERTS ({len(burnout_alerts)} channels):")
             for channel, alert in burnout_alerts.items():
-                risk_emoji = "🔴" if alert['risk_level'] == 'high' else "🟡"
-                print(f"  {risk_emoji} {channel}: {alert['risk_level'].upper()} risk (score: {alert['risk_score']:.1f})")
+                risk_emoji = "🔴" if alert['risk_level'] == RiskLevel.HIGH else "🟡"
+                print(f"  {risk_emoji} {channel}: {str(alert['risk_level']).upper()} risk (score: {alert['risk_score']:.1f})")
                 
                 if alert['warning_indicators']:
                     for indicator in alert['warning_indicators'][:2]:  # Show first 2
@@ -259,6 +411,28 @@ class EngagementAnalyzer:
     def get_database_stats(self) -> Dict[str, Any]:
         return self.data_storage.get_database_stats()
     
+    def export_channel_history(self, out_dir: str, days_back: int = None) -> Dict[str, Path]:
+        if days_back is None:
+            days_back = self.config.get_analysis_days()
+        
+        monitored_channels = self.config.get_monitored_channels()
+        self.logger.info(f"Exporting {days_back} days of history for {monitored_channels} to {out_dir}")
+        return self.slack_collector.stream_to_jsonl(list(monitored_channels), days_back, out_dir)
+    
+    def backfill_sentiment(self, export_dir: str) -> int:
+        # Score exported history through the Batch API so later runs hit the GPT result cache
+        texts = []
+        for path in sorted(Path(export_dir).glob('*.jsonl')):
+            with open(path, 'rb') as f:
+                texts.extend(orjson.loads(line).get('text', '') for line in f if line.strip())
+        
+        if not texts:
+            self.logger.warning(f"No exported messages found in {export_dir}")
+            return 0
+        
+        self.logger.info(f"Backfilling sentiment for {len(texts)} messages from {export_dir}")
+        return len(self.sentiment_analyzer.analyze_messages_sentiment_offline(texts))
+    
     def run_analysis(self, days_back: int = None, generate_reports: bool = True, 
                     print_summary: bool = True, cleanup: bool = True) -> Dict[str, Any]:
         try:
@@ -309,6 +483,8 @@ def main():
     parser.add_argument('--no-cleanup', action='store_true', help='Skip old data cleanup')
     parser.add_argument('--test-connection', action='store_true', help='Test Slack connection only')
     parser.add_argument('--db-stats', action='store_true', help='Show database statistics')
+    parser.add_argument('--export-jsonl', metavar='DIR', help='Write raw channel history as JSONL files to DIR and exit')
+    parser.add_argument('--backfill', metavar='DIR', help='Score JSONL exports in DIR with the GPT Batch API and exit')
     
     args = parser.parse_args()
     
@@ -326,6 +502,18 @@ def main():
                 print(f"  {key}: {value}")
             sys.exit(0)
         
+        if args.export_jsonl:
+            paths = analyzer.export_channel_history(args.export_jsonl, days_back=args.days)
+            print(f"\n📦 Exported {len(paths)} channels:")
+            for channel_name, path in paths.items():
+                print(f"  - {channel_name}: {path}")
+            sys.exit(0)
+        
+        if args.backfill:
+            count = analyzer.backfill_sentiment(args.backfill)
+            print(f"\n🧮 Backfilled sentiment for {count} messages")
+            sys.exit(0)
+        
         # Run full analysis
         result = analyzer.run_analysis(
             days_back=args.days,
@@ -1,8 +1,177 @@
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Tuple
-import pandas as pd
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+from dataclasses import dataclass, field
+import numpy as np
 import logging
-from collections import defaultdict, Counter
+from functools import lru_cache
+
+# Indexed by ((local_seconds // 86400) + 3) % 7; the epoch fell on a Thursday
+DAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+def _local_seconds(epoch: np.ndarray) -> np.ndarray:
+    # Shift epoch seconds to local wall-clock seconds, resolving the UTC offset
+    # once per distinct epoch hour so DST matches datetime.fromtimestamp
+    seconds = np.floor(epoch).astype(np.int64)
+    epoch_hours, inverse = np.unique(seconds // 3600, return_inverse=True)
+    offsets = np.fromiter(
+        (datetime.fromtimestamp(int(h) * 3600).astimezone().utcoffset().total_seconds() for h in epoch_hours),
+        dtype=np.int64,
+        count=len(epoch_hours)
+    )
+    return seconds + offsets[inverse.reshape(-1)]
+
+@lru_cache(maxsize=4096)
+def _engagement_score(message_count: int, reaction_count: int, emoji_count: int, active_hours: int) -> float:
+    # Normalize components
+    msg_score = message_count / 20  # Cap at 20 messages
+    reaction_score = reaction_count / 10  # Cap at 10 reactions
+    emoji_score = emoji_count / 15  # Cap at 15 emojis
+    hours_score = active_hours / 24  # Hours spread throughout day
+    
+    # Weighted combination
+    engagement = (
+        0.4 * msg_score + 
+        0.3 * reaction_score + 
+        0.2 * emoji_score + 
+        0.1 * hours_score
+    )
+    
+    return round(engagement, 3)
+
+def _trend_slopes(series: np.ndarray) -> np.ndarray:
+    # Least-squares slope of each row against x = 0..n-1; for evenly spaced x
+    # the denominator sum((x - x_mean) ** 2) is n * (n ** 2 - 1) / 12
+    n = series.shape[1]
+    x_centered = np.arange(n, dtype=np.float64) - (n - 1) / 2.0
+    return (series - series.mean(axis=1, keepdims=True)) @ x_centered / (n * (n ** 2 - 1) / 12.0)
+
+def _reduce_daily(group: np.ndarray, hours: np.ndarray, sentiment: np.ndarray, emoji_count: np.ndarray,
+                  reaction_total: np.ndarray, thread_flag: np.ndarray, n_groups: int) -> Dict[str, np.ndarray]:
+    # Per-group sums in vectorized bincount passes; NaN sentiment marks unscored messages
+    message_count = np.bincount(group, minlength=n_groups)
+    scored = ~np.isnan(sentiment)
+    sentiment_n = np.bincount(group[scored], minlength=n_groups)
+    sentiment_sum = np.bincount(group[scored], weights=sentiment[scored], minlength=n_groups)
+    avg_sentiment = np.divide(sentiment_sum, sentiment_n, out=np.zeros(n_groups), where=sentiment_n > 0)
+    
+    # Sample std from squared deviations about each group's mean (two-pass, numerically stable)
+    deviations = sentiment[scored] - avg_sentiment[group[scored]]
+    sentiment_m2 = np.bincount(group[scored], weights=deviations * deviations, minlength=n_groups)
+    sentiment_std = np.sqrt(np.divide(
+        sentiment_m2, sentiment_n - 1, out=np.zeros(n_groups), where=sentiment_n > 1
+    ))
+    
+    # Active hours as a 24-bit mask: OR of 1 << hour is the sum over distinct (group, hour) pairs
+    pairs = np.unique(group * 24 + hours)
+    active_hours_mask = np.bincount(
+        pairs // 24, weights=np.left_shift(1, pairs % 24), minlength=n_groups
+    ).astype(np.int64)
+    
+    return {
+        'message_count': message_count,
+        'avg_sentiment': avg_sentiment,
+        'sentiment_std': sentiment_std,
+        'emoji_count': np.bincount(group, weights=emoji_count, minlength=n_groups).astype(np.int64),
+        'reaction_count': np.bincount(group, weights=reaction_total, minlength=n_groups).astype(np.int64),
+        'thread_messages': np.bincount(group, weights=thread_flag, minlength=n_groups).astype(np.int64),
+        'active_hours_mask': active_hours_mask
+    }
+
+@dataclass(slots=True)
+class DailyMetrics:
+    # One row per (channel, date) as parallel arrays; rows are grouped by channel in
+    # first-seen order with dates ascending, and channel i owns rows
+    # channel_starts[i]:channel_starts[i + 1]
+    channels: List[str]
+    channel_starts: np.ndarray
+    dates: List[str]
+    message_count: np.ndarray
+    avg_sentiment: np.ndarray
+    sentiment_std: np.ndarray
+    emoji_count: np.ndarray
+    reaction_count: np.ndarray
+    active_hours_count: np.ndarray
+    active_hours_mask: np.ndarray
+    thread_participation: np.ndarray
+    engagement_score: np.ndarray
+    
+    @classmethod
+    def empty(cls) -> 'DailyMetrics':
+        ints, floats = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+        return cls(
+            channels=[], channel_starts=np.zeros(1, dtype=np.int64), dates=[],
+            message_count=ints, avg_sentiment=floats, sentiment_std=floats, emoji_count=ints,
+            reaction_count=ints, active_hours_count=ints, active_hours_mask=ints,
+            thread_participation=floats, engagement_score=floats
+        )
+    
+    def __len__(self) -> int:
+        return len(self.dates)
+    
+    def channel_rows(self) -> Iterator[Tuple[str, slice]]:
+        for i, channel_name in enumerate(self.channels):
+            yield channel_name, slice(int(self.channel_starts[i]), int(self.channel_starts[i + 1]))
+    
+    def to_nested_dict(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        # {channel: {date: metrics}} view for the detector, storage and report call sites;
+        # rows are grouped by channel with ascending dates, so each inner dict is chronological
+        columns = zip(
+            self.dates,
+            self.message_count.tolist(),
+            self.avg_sentiment.tolist(),
+            self.sentiment_std.tolist(),
+            self.emoji_count.tolist(),
+            self.reaction_count.tolist(),
+            self.active_hours_count.tolist(),
+            self.active_hours_mask.tolist(),
+            self.thread_participation.tolist(),
+            self.engagement_score.tolist()
+        )
+        
+        nested = {channel_name: {} for channel_name in self.channels}
+        for channel_name, rows in self.channel_rows():
+            channel_metrics = nested[channel_name]
+            for _ in range(rows.stop - rows.start):
+                date_str, messages, sentiment, std, emojis, reactions, hours, mask, threads, score = next(columns)
+                channel_metrics[date_str] = {
+                    'message_count': messages,
+                    'avg_sentiment': sentiment,
+                    'sentiment_std': std,
+                    'emoji_count': emojis,
+                    'reaction_count': reactions,
+                    'active_hours_count': hours,
+                    'active_hours': [hour for hour in range(24) if mask >> hour & 1],
+                    'thread_participation': threads,
+                    'engagement_score': score
+                }
+        return nested
+
+@dataclass(slots=True, frozen=True)
+class MessageSentiment:
+    # The per-message scores kept after analysis; NaN overall_sentiment marks a message with no scored text
+    overall_sentiment: float = float('nan')
+    emoji_count: int = 0
+    reaction_sentiment: float = 0.0
+    reaction_count: int = 0
+    
+    @classmethod
+    def from_dict(cls, sentiment: Dict[str, Any]) -> 'MessageSentiment':
+        return cls(
+            overall_sentiment=sentiment.get('overall_sentiment', float('nan')),
+            emoji_count=sentiment.get('emoji_count', 0),
+            reaction_sentiment=sentiment.get('reaction_sentiment', 0.0),
+            reaction_count=sentiment.get('reaction_count', 0)
+        )
+
+@dataclass(slots=True)
+class MessageColumns:
+    # Per-message column buffers filled by EngagementTracker.ingest_channel
+    channel: List[str] = field(default_factory=list)
+    ts: List[float] = field(default_factory=list)
+    sentiment: List[float] = field(default_factory=list)
+    emoji_count: List[int] = field(default_factory=list)
+    reaction_total: List[int] = field(default_factory=list)
+    thread_flag: List[bool] = field(default_factory=list)
 
 class EngagementTracker:
     def __init__(self):
@@ -18,118 +187,157 @@ class EngagementTracker:
             'day_name': dt.strftime('%A')
         }
     
-    def calculate_daily_metrics(self, channel_data: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Dict]:
-        daily_metrics = defaultdict(lambda: defaultdict(dict))
+    def ingest_channel(self, channel_name: str, messages: List[Dict[str, Any]], columns: MessageColumns,
+                       sentiments: Optional[List[Optional[MessageSentiment]]] = None):
+        # Append one row per message; sentiments defaults to the ones attached to the messages
+        if sentiments is None:
+            sentiments = [
+                MessageSentiment.from_dict(message['sentiment']) if message.get('sentiment') else None
+                for message in messages
+            ]
         
-        for channel_name, messages in channel_data.items():
-            channel_daily_data = defaultdict(lambda: {
-                'message_count': 0,
-                'sentiment_scores': [],
-                'emoji_counts': 0,
-                'reaction_counts': 0,
-                'active_hours': set(),
-                'response_times': [],
-                'thread_messages': 0
-            })
+        # Bind the column appends once; the loop body is the per-message hot path
+        append_ts = columns.ts.append
+        append_sentiment = columns.sentiment.append
+        append_emoji_count = columns.emoji_count.append
+        append_reaction_total = columns.reaction_total.append
+        append_thread_flag = columns.thread_flag.append
+        nan = float('nan')
+        
+        columns.channel.extend([channel_name] * len(messages))
+        for message, sentiment in zip(messages, sentiments):
+            ts = message['ts']
+            append_ts(float(ts))
             
-            for message in messages:
-                ts_info = self.extract_timestamp_info(message['ts'])
-                date_str = ts_info['date'].strftime('%Y-%m-%d')
-                
-                # Count messages
-                channel_daily_data[date_str]['message_count'] += 1
-                
-                # Track active hours
-                channel_daily_data[date_str]['active_hours'].add(ts_info['hour'])
-                
-                # Sentiment (if analyzed)
-                if 'sentiment' in message:
-                    channel_daily_data[date_str]['sentiment_scores'].append(
-                        message['sentiment']['overall_sentiment']
-                    )
-                    channel_daily_data[date_str]['emoji_counts'] += message['sentiment']['emoji_count']
-                
-                # Reactions
-                if 'reactions' in message and message['reactions']:
-                    total_reactions = sum(r.get('count', 0) for r in message['reactions'])
-                    channel_daily_data[date_str]['reaction_counts'] += total_reactions
-                
-                # Thread tracking
-                if message.get('thread_ts') and message.get('thread_ts') != message.get('ts'):
-                    channel_daily_data[date_str]['thread_messages'] += 1
+            if sentiment is not None:
+                append_sentiment(sentiment.overall_sentiment)
+                append_emoji_count(sentiment.emoji_count)
+            else:
+                append_sentiment(nan)
+                append_emoji_count(0)
             
-            # Calculate averages and final metrics
-            for date_str, data in channel_daily_data.items():
-                sentiment_scores = data['sentiment_scores']
-                daily_metrics[channel_name][date_str] = {
-                    'message_count': data['message_count'],
-                    'avg_sentiment': sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else 0.0,
-                    'sentiment_std': pd.Series(sentiment_scores).std() if len(sentiment_scores) > 1 else 0.0,
-                    'emoji_count': data['emoji_counts'],
-                    'reaction_count': data['reaction_counts'],
-                    'active_hours_count': len(data['active_hours']),
-                    'active_hours': sorted(list(data['active_hours'])),
-                    'thread_participation': data['thread_messages'] / max(data['message_count'], 1),
-                    'engagement_score': self.calculate_engagement_score(
-                        data['message_count'], 
-                        data['reaction_counts'], 
-                        data['emoji_counts'],
-                        len(data['active_hours'])
-                    )
-                }
+            reactions = message.get('reactions')
+            append_reaction_total(sum(r.get('count', 0) for r in reactions) if reactions else 0)
+            
+            thread_ts = message.get('thread_ts')
+            append_thread_flag(bool(thread_ts) and thread_ts != ts)
+    
+    def collect_columns(self, channel_data: Dict[str, List[Dict[str, Any]]]) -> MessageColumns:
+        columns = MessageColumns()
+        for channel_name, messages in channel_data.items():
+            self.ingest_channel(channel_name, messages, columns)
+        return columns
+    
+    def analyze_activity(self, columns: MessageColumns) -> Tuple[DailyMetrics, Dict[str, Any]]:
+        # Daily metrics and peak activity share one local-time conversion
+        local = _local_seconds(np.asarray(columns.ts, dtype=np.float64))
+        return self.daily_metrics_from_columns(columns, local), self.activity_patterns_from_local(local)
+    
+    def calculate_daily_metrics(self, channel_data: Dict[str, List[Dict[str, Any]]]) -> DailyMetrics:
+        columns = self.collect_columns(channel_data)
+        return self.daily_metrics_from_columns(columns, _local_seconds(np.asarray(columns.ts, dtype=np.float64)))
+    
+    def daily_metrics_from_columns(self, columns: MessageColumns, local: np.ndarray) -> DailyMetrics:
+        if not columns.ts:
+            return DailyMetrics.empty()
+        
+        # Integer group id per message: channel in first-seen order, then local day
+        channel_index = {}
+        channel_idx = np.fromiter(
+            (channel_index.setdefault(channel, len(channel_index)) for channel in columns.channel),
+            dtype=np.int64,
+            count=len(columns.channel)
+        )
+        days, day_idx = np.unique(local // 86400, return_inverse=True)
+        day_idx = day_idx.reshape(-1)
+        hours = (local // 3600) % 24
+        group = channel_idx * len(days) + day_idx
+        n_groups = len(channel_index) * len(days)
         
-        return dict(daily_metrics)
+        reduced = _reduce_daily(
+            group, hours, np.asarray(columns.sentiment, dtype=np.float64),
+            np.asarray(columns.emoji_count, dtype=np.float64),
+            np.asarray(columns.reaction_total, dtype=np.float64),
+            np.asarray(columns.thread_flag, dtype=np.float64),
+            n_groups
+        )
+        
+        # Group ids are channel-major, so non-empty groups come out ordered by channel, then date
+        present = np.flatnonzero(reduced['message_count'])
+        row_channel = present // len(days)
+        message_count = reduced['message_count'][present]
+        reaction_count = reduced['reaction_count'][present]
+        emoji_count = reduced['emoji_count'][present]
+        active_hours_mask = reduced['active_hours_mask'][present]
+        active_hours_count = np.array([mask.bit_count() for mask in active_hours_mask.tolist()], dtype=np.int64)
+        
+        # Format each distinct local day once rather than once per message
+        day_labels = [str(np.datetime64(int(day), 'D')) for day in days]
+        
+        return DailyMetrics(
+            channels=list(channel_index),
+            channel_starts=np.searchsorted(row_channel, np.arange(len(channel_index) + 1)),
+            dates=[day_labels[d] for d in (present % len(days)).tolist()],
+            message_count=message_count,
+            avg_sentiment=reduced['avg_sentiment'][present],
+            sentiment_std=reduced['sentiment_std'][present],
+            emoji_count=emoji_count,
+            reaction_count=reaction_count,
+            active_hours_count=active_hours_count,
+            active_hours_mask=active_hours_mask,
+            thread_participation=reduced['thread_messages'][present] / np.maximum(message_count, 1),
+            engagement_score=np.array([
+                self.calculate_engagement_score(m, r, e, h)
+                for m, r, e, h in zip(
+                    message_count.tolist(), reaction_count.tolist(),
+                    emoji_count.tolist(), active_hours_count.tolist()
+                )
+            ], dtype=np.float64)
+        )
     
     def calculate_engagement_score(self, message_count: int, reaction_count: int, 
                                  emoji_count: int, active_hours: int) -> float:
-        # Normalize components
-        msg_score = min(message_count / 20, 1.0)  # Cap at 20 messages
-        reaction_score = min(reaction_count / 10, 1.0)  # Cap at 10 reactions
-        emoji_score = min(emoji_count / 15, 1.0)  # Cap at 15 emojis
-        hours_score = active_hours / 24  # Hours spread throughout day
-        
-        # Weighted combination
-        engagement = (
-            0.4 * msg_score + 
-            0.3 * reaction_score + 
-            0.2 * emoji_score + 
-            0.1 * hours_score
+        # Clamp to the component caps so equivalent days share a cache entry
+        return _engagement_score(
+            min(message_count, 20),
+            min(reaction_count, 10),
+            min(emoji_count, 15),
+            min(active_hours, 24)
         )
-        
-        return round(engagement, 3)
     
     def analyze_peak_activity_patterns(self, channel_data: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
-        hourly_activity = defaultdict(int)
-        daily_activity = defaultdict(int)
-        
-        for channel_name, messages in channel_data.items():
-            for message in messages:
-                ts_info = self.extract_timestamp_info(message['ts'])
-                hourly_activity[ts_info['hour']] += 1
-                daily_activity[ts_info['day_name']] += 1
+        epoch = np.fromiter(
+            (float(message['ts']) for messages in channel_data.values() for message in messages),
+            dtype=np.float64
+        )
+        return self.activity_patterns_from_local(_local_seconds(epoch))
+    
+    def activity_patterns_from_local(self, local: np.ndarray) -> Dict[str, Any]:
+        hour_counts = np.bincount((local // 3600) % 24, minlength=24)
+        day_counts = np.bincount(((local // 86400) + 3) % 7, minlength=7)
+        hourly_activity = {hour: int(count) for hour, count in enumerate(hour_counts) if count}
+        daily_activity = {DAY_NAMES[day]: int(count) for day, count in enumerate(day_counts) if count}
         
-        peak_hour = max(hourly_activity.items(), key=lambda x: x[1])[0] if hourly_activity else 12
-        peak_day = max(daily_activity.items(), key=lambda x: x[1])[0] if daily_activity else 'Monday'
+        # Ties resolve to the earliest hour / weekday
+        peak_hour = int(np.argmax(hour_counts)) if hourly_activity else 12
+        peak_day = DAY_NAMES[int(np.argmax(day_counts))] if daily_activity else 'Monday'
         
         return {
             'peak_hour': peak_hour,
             'peak_day': peak_day,
-            'hourly_distribution': dict(hourly_activity),
-            'daily_distribution': dict(daily_activity),
-            'total_messages': sum(hourly_activity.values())
+            'hourly_distribution': hourly_activity,
+            'daily_distribution': daily_activity,
+            'total_messages': len(local)
         }
     
-    def calculate_engagement_trends(self, daily_metrics: Dict[str, Dict], days: int = 7) -> Dict[str, Any]:
+    def calculate_engagement_trends(self, daily_metrics: DailyMetrics, days: int = 7) -> Dict[str, Any]:
         trends = {}
         
-        for channel_name, channel_metrics in daily_metrics.items():
-            if not channel_metrics:
-                continue
-            
-            dates = sorted(channel_metrics.keys())
-            recent_dates = dates[-days:] if len(dates) >= days else dates
+        # Rows are already in date order within each channel
+        for channel_name, rows in daily_metrics.channel_rows():
+            recent = slice(max(rows.start, rows.stop - days), rows.stop)
             
-            if len(recent_dates) < 2:
+            if recent.stop - recent.start < 2:
                 trends[channel_name] = {
                     'sentiment_trend': 'stable',
                     'engagement_trend': 'stable',
@@ -139,13 +347,15 @@ class EngagementTracker:
                 continue
             
             # Calculate trends
-            sentiment_values = [channel_metrics[date]['avg_sentiment'] for date in recent_dates]
-            engagement_values = [channel_metrics[date]['engagement_score'] for date in recent_dates]
-            message_values = [channel_metrics[date]['message_count'] for date in recent_dates]
+            sentiment_values = daily_metrics.avg_sentiment[recent].tolist()
+            engagement_values = daily_metrics.engagement_score[recent].tolist()
+            message_values = daily_metrics.message_count[recent].tolist()
             
-            sentiment_trend = self.calculate_trend_direction(sentiment_values)
-            engagement_trend = self.calculate_trend_direction(engagement_values)
-            message_trend = self.calculate_trend_direction(message_values)
+            # Fit all three series with one matrix product
+            slopes = _trend_slopes(np.array([sentiment_values, engagement_values, message_values], dtype=np.float64))
+            sentiment_trend = self.classify_trend(sentiment_values, slopes[0])
+            engagement_trend = self.classify_trend(engagement_values, slopes[1])
+            message_trend = self.classify_trend(message_values, slopes[2])
             
             trends[channel_name] = {
                 'sentiment_trend': sentiment_trend['direction'],
@@ -164,22 +374,10 @@ class EngagementTracker:
         if len(values) < 2:
             return {'direction': 'stable', 'change': 0.0}
         
-        # Simple linear trend calculation
-        n = len(values)
-        x_values = list(range(n))
-        
-        # Calculate slope
-        x_mean = sum(x_values) / n
-        y_mean = sum(values) / n
-        
-        numerator = sum((x_values[i] - x_mean) * (values[i] - y_mean) for i in range(n))
-        denominator = sum((x_values[i] - x_mean) ** 2 for i in range(n))
-        
-        if denominator == 0:
-            slope = 0
-        else:
-            slope = numerator / denominator
-        
+        slope = _trend_slopes(np.array([values], dtype=np.float64))[0]
+        return self.classify_trend(values, slope)
+    
+    def classify_trend(self, values: List[float], slope: float) -> Dict[str, Any]:
         # Classify trend
         if slope > 0.05:
             direction = 'increasing'
@@ -197,29 +395,30 @@ class EngagementTracker:
         return {
             'direction': direction,
             'change': round(change, 2),
-            'slope': round(slope, 4)
+            'slope': round(float(slope), 4)
         }
     
-    def get_engagement_summary(self, daily_metrics: Dict[str, Dict]) -> Dict[str, Any]:
-        total_messages = 0
-        total_channels = len(daily_metrics)
-        sentiment_scores = []
-        engagement_scores = []
+    def get_engagement_summary(self, daily_metrics: DailyMetrics) -> Dict[str, Any]:
+        if not len(daily_metrics):
+            return {
+                'total_channels_monitored': 0,
+                'total_messages_analyzed': 0,
+                'overall_avg_sentiment': 0.0,
+                'overall_avg_engagement': 0.0,
+                'sentiment_distribution': self.get_sentiment_distribution([]),
+                'most_active_channel': None
+            }
         
-        for channel_name, channel_metrics in daily_metrics.items():
-            for date, metrics in channel_metrics.items():
-                total_messages += metrics['message_count']
-                sentiment_scores.append(metrics['avg_sentiment'])
-                engagement_scores.append(metrics['engagement_score'])
+        # Per-channel message totals over each channel's contiguous block of rows
+        channel_totals = np.add.reduceat(daily_metrics.message_count, daily_metrics.channel_starts[:-1])
         
         return {
-            'total_channels_monitored': total_channels,
-            'total_messages_analyzed': total_messages,
-            'overall_avg_sentiment': sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else 0.0,
-            'overall_avg_engagement': sum(engagement_scores) / len(engagement_scores) if engagement_scores else 0.0,
-            'sentiment_distribution': self.get_sentiment_distribution(sentiment_scores),
-            'most_active_channel': max(daily_metrics.keys(), 
-                                     key=lambda ch: sum(m['message_count'] for m in daily_metrics[ch].values())) if daily_metrics else None
+            'total_channels_monitored': len(daily_metrics.channels),
+            'total_messages_analyzed': int(daily_metrics.message_count.sum()),
+            'overall_avg_sentiment': float(daily_metrics.avg_sentiment.mean()),
+            'overall_avg_engagement': float(daily_metrics.engagement_score.mean()),
+            'sentiment_distribution': self.get_sentiment_distribution(daily_metrics.avg_sentiment.tolist()),
+            'most_active_channel': daily_metrics.channels[int(np.argmax(channel_totals))]
         }
     
     def get_sentiment_distribution(self, sentiment_scores: List[float]) -> Dict[str, float]:
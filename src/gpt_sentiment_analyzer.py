@@ -1,106 +1,164 @@
 import os
 import re
-import json
-import emoji
+import orjson
+import time
 import logging
-from typing import Dict, List
-from openai import OpenAI
+import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import httpx
+from openai import DefaultHttpxClient, OpenAI, APITimeoutError, RateLimitError
 from dotenv import load_dotenv
 
+from sentiment_cache import SentimentResultCache
+from text_utils import (
+    categorize_sentiment, categorize_sentiments, clean_text_for_analysis, extract_emojis,
+    mean_emoji_sentiment, mean_emoji_sentiments, mean_reaction_sentiment
+)
+
 load_dotenv()
 
+# Messages sent per chat completion; the instructions are paid once per batch
+GPT_BATCH_SIZE = 20
+
+# Batches in flight at once; keep under the account's requests-per-minute limit
+GPT_CONCURRENCY = 4
+GPT_MAX_RETRIES = 4
+GPT_RETRY_BASE_DELAY = 1.0
+
+# Output budget per batch: each result is ~50-60 tokens (four keys plus up to 20 words of
+# reasoning), plus the results wrapper; truncated JSON would re-send the batch one message at a time
+GPT_TOKENS_PER_MESSAGE = 100
+GPT_BATCH_BASE_TOKENS = 50
+
+# One connection pool for every analyzer instance; HTTP/2 multiplexes concurrent batches
+_HTTP_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20)
+_shared_http_client = None
+
+# How often a submitted Batch API job is checked for completion
+GPT_OFFLINE_POLL_SECONDS = 30
+
+# Results remembered per normalized message text; chat repeats "thanks!", "lgtm", standup lines
+GPT_CACHE_SIZE = 10000
+
+# Acknowledgements that are neutral however they are meant; only these exact messages skip GPT.
+# Other short messages ("I quit", "fml", "meh") are often the strongest burnout signals
+_NEUTRAL_SHORT_TEXTS = frozenset({
+    'ok', 'okay', 'k', 'kk', 'lgtm', '+1', 'ack', 'done?', 'noted', 'yes', 'yep', 'sure', 'np'
+})
+
+_NUMBER_RE = re.compile(r'[-+]?[0-9]*\.?[0-9]+')
+
+# Keyword parsing of unstructured GPT replies; the lookahead lets matches overlap like substring tests
+_POLARITY_RE = re.compile(r'(?=(very )?(positive|negative))')
+_FALLBACK_CATEGORIES = {
+    'positive': (0.5, 'positive'),
+    'negative': (-0.5, 'negative'),
+    'very_positive': (0.8, 'very_positive'),
+    'very_negative': (-0.8, 'very_negative')
+}
+
+GPT_MODEL = "gpt-4o-mini"
+# Bump when the prompt or schema changes so persisted results are not reused
+GPT_PROMPT_VERSION = 2
+
+# The rubric lives in the system message and the output shape in the JSON schema;
+# static text goes first and the messages last so calls share a cacheable prefix
+GPT_SYSTEM_PROMPT = (
+    "Rate the sentiment of workplace Slack messages. sentiment_score: -1.0 very negative "
+    "to 1.0 very positive. confidence: 0.0 to 1.0. reasoning: at most 20 words."
+)
+GPT_BATCH_INSTRUCTIONS = "Rate each numbered message; return results in input order."
+
+SENTIMENT_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'sentiment_score': {'type': 'number'},
+        'confidence': {'type': 'number'},
+        'category': {'type': 'string', 'enum': ['very_positive', 'positive', 'neutral', 'negative', 'very_negative']},
+        'reasoning': {'type': 'string'}
+    },
+    'required': ['sentiment_score', 'confidence', 'category', 'reasoning'],
+    'additionalProperties': False
+}
+
+GPT_MESSAGE_FORMAT = {
+    'type': 'json_schema',
+    'json_schema': {'name': 'sentiment', 'strict': True, 'schema': SENTIMENT_SCHEMA}
+}
+
+GPT_BATCH_FORMAT = {
+    'type': 'json_schema',
+    'json_schema': {
+        'name': 'sentiments',
+        'strict': True,
+        'schema': {
+            'type': 'object',
+            'properties': {'results': {'type': 'array', 'items': SENTIMENT_SCHEMA}},
+            'required': ['results'],
+            'additionalProperties': False
+        }
+    }
+}
+
+def shared_http_client() -> httpx.Client:
+    global _shared_http_client
+    if _shared_http_client is None:
+        try:
+            _shared_http_client = DefaultHttpxClient(http2=True, limits=_HTTP_LIMITS)
+        except ImportError:
+            # h2 is not installed; still reuse connections over HTTP/1.1
+            _shared_http_client = DefaultHttpxClient(limits=_HTTP_LIMITS)
+    return _shared_http_client
+
 class GPTSentimentAnalyzer:
-    def __init__(self):
-        self.client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+    def __init__(self, result_cache_path: Optional[str] = None):
+        self.client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'), http_client=shared_http_client())
         self.logger = logging.getLogger(__name__)
+        self.result_cache = OrderedDict()
         
-        # Emoji sentiment mapping (fallback for when GPT is unavailable)
-        self.emoji_sentiment = {
-            '😊': 0.8, '😀': 0.8, '😃': 0.8, '😄': 0.8, '😁': 0.8,
-            '😆': 0.7, '😂': 0.9, '🤣': 0.9, '😇': 0.6, '🙂': 0.5,
-            '😉': 0.5, '😋': 0.6, '😎': 0.7, '🤗': 0.8, '🤩': 0.9,
-            '😍': 0.9, '🥰': 0.9, '😘': 0.8, '😗': 0.6, '☺️': 0.6,
-            '😌': 0.4, '😏': 0.3, '🤔': 0.1, '🙄': -0.3, '😒': -0.4,
-            '😔': -0.6, '😞': -0.7, '😟': -0.6, '😢': -0.8, '😭': -0.9,
-            '😤': -0.5, '😠': -0.7, '😡': -0.8, '🤬': -0.9, '😰': -0.6,
-            '😨': -0.7, '😱': -0.8, '😪': -0.4, '🙃': 0.2, '😶': 0.0,
-            '🤐': -0.1, '😐': 0.0, '😑': -0.1, '🤨': -0.2, '🧐': 0.1,
-            '🤯': -0.3, '😵': -0.5, '🥴': -0.2, '🤮': -0.8, '🤢': -0.6,
-            '🤧': -0.3, '😷': -0.2, '🤒': -0.4, '🤕': -0.5, '👍': 0.6,
-            '👎': -0.6, '👏': 0.7, '🙌': 0.8, '👌': 0.5, '✨': 0.6,
-            '🎉': 0.9, '🎊': 0.8, '💪': 0.7, '🔥': 0.8, '⭐': 0.6,
-            '💯': 0.8, '✅': 0.6, '❌': -0.5, '⚠️': -0.3, '🚨': -0.6,
-            '💔': -0.8, '❤️': 0.9, '💕': 0.8, '💖': 0.8, '💗': 0.8,
-            '😴': -0.1, '💤': -0.1, '🤤': 0.1, '😻': 0.8, '💀': -0.7
-        }
+        # Results persisted across runs, behind the in-memory LRU
+        self.result_store = None
+        if result_cache_path:
+            try:
+                self.result_store = SentimentResultCache(
+                    result_cache_path, namespace=f"{GPT_MODEL}:{GPT_PROMPT_VERSION}"
+                )
+            except Exception as e:
+                self.logger.warning(f"GPT result cache unavailable, continuing without it: {e}")
     
     def extract_emojis(self, text: str) -> List[str]:
-        return [char for char in text if char in emoji.EMOJI_DATA]
+        return extract_emojis(text)
     
     def analyze_emoji_sentiment_fallback(self, emojis: List[str]) -> float:
-        if not emojis:
-            return 0.0
-        
-        sentiment_scores = [
-            self.emoji_sentiment.get(em, 0.0) for em in emojis
-        ]
-        
-        return sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else 0.0
+        return mean_emoji_sentiment(emojis)
+    
+    def analyze_emoji_sentiments_fallback(self, emoji_lists: List[List[str]]) -> np.ndarray:
+        return mean_emoji_sentiments(emoji_lists)
     
     def clean_text_for_analysis(self, text: str) -> str:
-        # Remove URLs
-        text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
-        # Remove user mentions
-        text = re.sub(r'<@[UW][A-Z0-9]+(?:\|[^>]+)?>', '', text)
-        # Remove channel mentions
-        text = re.sub(r'<#[C][A-Z0-9]+(?:\|[^>]+)?>', '', text)
-        # Remove special Slack formatting
-        text = re.sub(r'<[^>]+>', '', text)
-        # Remove excess whitespace
-        text = ' '.join(text.split())
-        return text.strip()
+        return clean_text_for_analysis(text)
     
     def analyze_text_sentiment_gpt(self, text: str) -> Dict[str, float]:
         clean_text = self.clean_text_for_analysis(text)
         if not clean_text:
-            return {
-                'sentiment_score': 0.0,
-                'confidence': 0.0,
-                'category': 'neutral',
-                'reasoning': 'Empty text'
-            }
+            return self.empty_text_result()
         
         try:
-            # Create a detailed prompt for sentiment analysis
-            prompt = f"""
-Analyze the sentiment of this workplace message and provide a detailed assessment:
-
-Message: "{clean_text}"
-
-Please provide:
-1. A sentiment score from -1.0 (very negative) to +1.0 (very positive)
-2. A confidence level from 0.0 to 1.0
-3. A category: "very_positive", "positive", "neutral", "negative", or "very_negative"
-4. Brief reasoning (max 50 words)
-
-Respond in JSON format:
-{{
-    "sentiment_score": <float>,
-    "confidence": <float>,
-    "category": "<string>",
-    "reasoning": "<string>"
-}}
-
-Consider workplace context: team collaboration, project updates, challenges, successes, etc.
-"""
-            
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
+            response = self.create_completion(
+                model=GPT_MODEL,
                 messages=[
-                    {"role": "system", "content": "You are an expert at analyzing workplace communication sentiment. Provide accurate, nuanced sentiment analysis that considers workplace context and team dynamics."},
-                    {"role": "user", "content": prompt}
+                    {"role": "system", "content": GPT_SYSTEM_PROMPT},
+                    {"role": "user", "content": f'Message: "{clean_text}"'}
                 ],
-                max_tokens=200,
+                # Structured output: the reply always matches the schema, so no prose to pay for
+                response_format=GPT_MESSAGE_FORMAT,
+                # One complete choice, no token log-probabilities
+                n=1,
+                stream=False,
+                logprobs=False,
+                max_tokens=120,
                 temperature=0.1  # Low temperature for consistent results
             )
             
@@ -108,21 +166,9 @@ Consider workplace context: team collaboration, project updates, challenges, suc
             
             # Parse JSON response
             try:
-                result = json.loads(response_text)
-                
-                # Validate and clean the response
-                sentiment_score = max(-1.0, min(1.0, float(result.get('sentiment_score', 0.0))))
-                confidence = max(0.0, min(1.0, float(result.get('confidence', 0.5))))
-                
-                return {
-                    'sentiment_score': sentiment_score,
-                    'confidence': confidence,
-                    'category': result.get('category', 'neutral'),
-                    'reasoning': result.get('reasoning', 'GPT analysis'),
-                    'gpt_response': response_text
-                }
+                return self.build_gpt_result(orjson.loads(response_text), response_text)
                 
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 self.logger.warning(f"Failed to parse GPT response: {response_text}")
                 # Fallback to simple parsing
                 return self.parse_gpt_response_fallback(response_text, clean_text)
@@ -130,13 +176,264 @@ Consider workplace context: team collaboration, project updates, challenges, suc
         except Exception as e:
             self.logger.error(f"GPT sentiment analysis failed: {e}")
             # Fallback to basic sentiment
-            return {
-                'sentiment_score': 0.0,
-                'confidence': 0.0,
-                'category': 'neutral',
-                'reasoning': f'GPT unavailable: {str(e)[:30]}',
-                'error': str(e)
-            }
+            return self.gpt_unavailable_result(e)
+    
+    def analyze_texts_sentiment_gpt(self, texts: List[str]) -> List[Dict[str, float]]:
+        results, pending = self.group_uncached_texts(texts)
+        if not pending:
+            return results
+        
+        keys = list(pending)
+        batches = [keys[start:start + GPT_BATCH_SIZE] for start in range(0, len(keys), GPT_BATCH_SIZE)]
+        
+        # Requests are network-bound, so overlap them; map keeps batch order
+        with ThreadPoolExecutor(max_workers=min(GPT_CONCURRENCY, len(batches))) as executor:
+            batch_results = executor.map(
+                self.analyze_batch_gpt,
+                [[pending[key][0] for key in batch] for batch in batches]
+            )
+            for batch, batch_result in zip(batches, batch_results):
+                self.fill_analyzed_texts(results, pending, batch, batch_result)
+        
+        return results
+    
+    def analyze_texts_sentiment_offline(self, texts: List[str],
+                                        poll_interval: float = GPT_OFFLINE_POLL_SECONDS) -> List[Dict[str, float]]:
+        # Batch API for backfills: half the token price and its own rate limit, but results
+        # can take up to 24h, so this blocks until the job finishes
+        results, pending = self.group_uncached_texts(texts)
+        if not pending:
+            return results
+        
+        keys = list(pending)
+        batches = [keys[start:start + GPT_BATCH_SIZE] for start in range(0, len(keys), GPT_BATCH_SIZE)]
+        request_lines = [
+            orjson.dumps({
+                'custom_id': str(n),
+                'method': 'POST',
+                'url': '/v1/chat/completions',
+                'body': self.build_batch_request([pending[key][0] for key in batch])
+            })
+            for n, batch in enumerate(batches)
+        ]
+        
+        error = None
+        try:
+            responses = self.run_offline_batch(b'\n'.join(request_lines), poll_interval)
+        except Exception as e:
+            self.logger.error(f"GPT offline batch failed: {e}")
+            error = e
+            responses = {}
+        
+        for n, batch in enumerate(batches):
+            clean_texts = [pending[key][0] for key in batch]
+            response_text = responses.get(str(n))
+            if response_text is None:
+                batch_error = error or RuntimeError('no response in batch output')
+                batch_result = [self.gpt_unavailable_result(batch_error) for _ in clean_texts]
+            else:
+                batch_result = self.parse_batch_response(response_text, clean_texts)
+            self.fill_analyzed_texts(results, pending, batch, batch_result)
+        
+        return results
+    
+    def run_offline_batch(self, requests_jsonl: bytes, poll_interval: float) -> Dict[str, str]:
+        input_file = self.client.files.create(file=('sentiment_requests.jsonl', requests_jsonl), purpose='batch')
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint='/v1/chat/completions',
+            completion_window='24h'
+        )
+        self.logger.info(f"Submitted GPT batch {batch.id}")
+        
+        while batch.status not in ('completed', 'failed', 'expired', 'cancelled'):
+            time.sleep(poll_interval)
+            batch = self.client.batches.retrieve(batch.id)
+        
+        if batch.status != 'completed' or not batch.output_file_id:
+            raise RuntimeError(f"GPT batch {batch.id} ended with status {batch.status}")
+        
+        # {custom_id: response text} for the requests that succeeded
+        responses = {}
+        for line in self.client.files.content(batch.output_file_id).content.splitlines():
+            record = orjson.loads(line)
+            response = record.get('response') or {}
+            if response.get('status_code') == 200:
+                responses[record['custom_id']] = response['body']['choices'][0]['message']['content'].strip()
+        
+        return responses
+    
+    def group_uncached_texts(self, texts: List[str]) -> Tuple[List[Optional[Dict]], Dict[str, Tuple[str, List[int]]]]:
+        results = [None] * len(texts)
+        
+        # Group texts by cache key so repeats cost one lookup or one prompt slot
+        pending = {}
+        skipped = 0
+        for i, text in enumerate(texts):
+            clean_text = self.clean_text_for_analysis(text)
+            if not clean_text:
+                results[i] = self.empty_text_result()
+                continue
+            
+            key = self.result_cache_key(clean_text)
+            if self.is_short_neutral_text(key):
+                results[i] = self.short_text_result()
+                skipped += 1
+                continue
+            
+            cached = self.result_cache.get(key)
+            if cached is not None:
+                self.result_cache.move_to_end(key)
+                results[i] = {**cached, 'cache_hit': True}
+            elif key in pending:
+                pending[key][1].append(i)
+            else:
+                pending[key] = (clean_text, [i])
+        
+        if skipped:
+            self.logger.debug(f"Skipped GPT for {skipped} of {len(texts)} short neutral messages")
+        
+        if self.result_store and pending:
+            for key, result in self.result_store.get_many(list(pending)).items():
+                self.store_cached_result(key, result)
+                for i in pending.pop(key)[1]:
+                    results[i] = {**result, 'cache_hit': True}
+        
+        return results, pending
+    
+    def is_short_neutral_text(self, key: str) -> bool:
+        # Trailing full stops and bangs do not change an acknowledgement ("ok." / "ack!")
+        return key in _NEUTRAL_SHORT_TEXTS or key.rstrip('.!') in _NEUTRAL_SHORT_TEXTS
+    
+    def fill_analyzed_texts(self, results: List[Optional[Dict]], pending: Dict[str, Tuple[str, List[int]]],
+                            keys: List[str], analyses: List[Dict[str, float]]):
+        fresh = []
+        for key, result in zip(keys, analyses):
+            # Failed calls are not remembered so the next run retries them
+            if 'error' not in result:
+                self.store_cached_result(key, result)
+                fresh.append((key, result))
+            for i in pending[key][1]:
+                results[i] = result
+        
+        if self.result_store and fresh:
+            self.result_store.set_many(fresh)
+    
+    def result_cache_key(self, clean_text: str) -> str:
+        # Only case and spacing are folded; emoji and emoticons ("great :)" vs "great :(") change the verdict
+        return ' '.join(clean_text.casefold().split())
+    
+    def store_cached_result(self, key: str, result: Dict[str, float]):
+        self.result_cache[key] = result
+        if len(self.result_cache) > GPT_CACHE_SIZE:
+            self.result_cache.popitem(last=False)
+    
+    def analyze_batch_gpt(self, clean_texts: List[str]) -> List[Dict[str, float]]:
+        try:
+            response = self.create_completion(**self.build_batch_request(clean_texts))
+            response_text = response.choices[0].message.content.strip()
+            
+        except Exception as e:
+            self.logger.error(f"GPT batch sentiment analysis failed: {e}")
+            return [self.gpt_unavailable_result(e) for _ in clean_texts]
+        
+        return self.parse_batch_response(response_text, clean_texts)
+    
+    def build_batch_request(self, clean_texts: List[str]) -> Dict[str, Any]:
+        message_lines = '\n'.join(f'Message {i}: "{text}"' for i, text in enumerate(clean_texts, 1))
+        prompt = f'{GPT_BATCH_INSTRUCTIONS}\n{message_lines}'
+        
+        return {
+            'model': GPT_MODEL,
+            'messages': [
+                {"role": "system", "content": GPT_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            'response_format': GPT_BATCH_FORMAT,
+            # One complete choice, no token log-probabilities
+            'n': 1,
+            'stream': False,
+            'logprobs': False,
+            'max_tokens': GPT_BATCH_BASE_TOKENS + GPT_TOKENS_PER_MESSAGE * len(clean_texts),
+            'temperature': 0.1  # Low temperature for consistent results
+        }
+    
+    def parse_batch_response(self, response_text: str, clean_texts: List[str]) -> List[Dict[str, float]]:
+        try:
+            items = orjson.loads(response_text).get('results')
+        except (orjson.JSONDecodeError, AttributeError):
+            items = None
+        
+        if not isinstance(items, list) or len(items) != len(clean_texts):
+            # Can't line results up with inputs, so score this batch one message at a time
+            self.logger.warning(f"Unusable GPT batch response, analyzing {len(clean_texts)} messages individually")
+            return [self.analyze_text_sentiment_gpt(text) for text in clean_texts]
+        
+        return [
+            self.build_gpt_result(item, response_text) if isinstance(item, dict)
+            else self.parse_gpt_response_fallback(str(item), text)
+            for item, text in zip(items, clean_texts)
+        ]
+    
+    def create_completion(self, **request):
+        # Back off exponentially when throttled; other errors go straight to the caller
+        for attempt in range(GPT_MAX_RETRIES):
+            try:
+                response = self.client.chat.completions.create(**request)
+                self.log_prompt_cache_usage(response)
+                return response
+            except (RateLimitError, APITimeoutError) as e:
+                if attempt == GPT_MAX_RETRIES - 1:
+                    raise
+                delay = GPT_RETRY_BASE_DELAY * 2 ** attempt
+                self.logger.warning(f"GPT request throttled, retrying in {delay:.0f}s: {e}")
+                time.sleep(delay)
+    
+    def log_prompt_cache_usage(self, response):
+        # Older API responses carry no prompt_tokens_details
+        usage = getattr(response, 'usage', None)
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached_tokens = getattr(details, 'cached_tokens', 0) or 0
+        if cached_tokens:
+            self.logger.debug(f"GPT prompt cache hit: {cached_tokens}/{usage.prompt_tokens} prompt tokens")
+    
+    def build_gpt_result(self, result: Dict, response_text: str) -> Dict[str, float]:
+        # Validate and clean the response
+        sentiment_score = max(-1.0, min(1.0, float(result.get('sentiment_score', 0.0))))
+        confidence = max(0.0, min(1.0, float(result.get('confidence', 0.5))))
+        
+        return {
+            'sentiment_score': sentiment_score,
+            'confidence': confidence,
+            'category': result.get('category', 'neutral'),
+            'reasoning': result.get('reasoning', 'GPT analysis'),
+            'gpt_response': response_text
+        }
+    
+    def empty_text_result(self) -> Dict[str, float]:
+        return {
+            'sentiment_score': 0.0,
+            'confidence': 0.0,
+            'category': 'neutral',
+            'reasoning': 'Empty text'
+        }
+    
+    def short_text_result(self) -> Dict[str, float]:
+        return {
+            'sentiment_score': 0.0,
+            'confidence': 0.3,
+            'category': 'neutral',
+            'reasoning': 'Short neutral message'
+        }
+    
+    def gpt_unavailable_result(self, error: Exception) -> Dict[str, float]:
+        return {
+            'sentiment_score': 0.0,
+            'confidence': 0.0,
+            'category': 'neutral',
+            'reasoning': f'GPT unavailable: {str(error)[:30]}',
+            'error': str(error)
+        }
     
     def parse_gpt_response_fallback(self, response_text: str, original_text: str) -> Dict[str, float]:
         # Simple fallback parsing if JSON fails
@@ -144,24 +441,24 @@ Consider workplace context: team collaboration, project updates, challenges, suc
         confidence = 0.5
         category = 'neutral'
         
-        # Look for key words in response
-        response_lower = response_text.lower()
-        if 'positive' in response_lower and 'negative' not in response_lower:
-            sentiment_score = 0.5
-            category = 'positive'
-        elif 'negative' in response_lower and 'positive' not in response_lower:
-            sentiment_score = -0.5
-            category = 'negative'
-        elif 'very positive' in response_lower:
-            sentiment_score = 0.8
-            category = 'very_positive'
-        elif 'very negative' in response_lower:
-            sentiment_score = -0.8
-            category = 'very_negative'
+        # Look for key words in response, in one scan
+        polarities = set()
+        very_polarities = set()
+        for match in _POLARITY_RE.finditer(response_text.lower()):
+            polarities.add(match.group(2))
+            if match.group(1):
+                very_polarities.add(match.group(2))
+        
+        # A lone polarity wins; "very ..." only decides when both words appear
+        if len(polarities) == 1:
+            sentiment_score, category = _FALLBACK_CATEGORIES[polarities.pop()]
+        elif 'positive' in very_polarities:
+            sentiment_score, category = _FALLBACK_CATEGORIES['very_positive']
+        elif 'negative' in very_polarities:
+            sentiment_score, category = _FALLBACK_CATEGORIES['very_negative']
         
         # Try to extract numeric score
-        import re
-        score_match = re.search(r'[-+]?[0-9]*\.?[0-9]+', response_text)
+        score_match = _NUMBER_RE.search(response_text)
         if score_match:
             try:
                 parsed_score = float(score_match.group())
@@ -179,72 +476,71 @@ Consider workplace context: team collaboration, project updates, challenges, suc
         }
     
     def analyze_message_sentiment(self, message_text: str) -> Dict[str, float]:
-        emojis = self.extract_emojis(message_text)
-        emoji_sentiment = self.analyze_emoji_sentiment_fallback(emojis)
-        
-        # Get GPT analysis
-        gpt_analysis = self.analyze_text_sentiment_gpt(message_text)
-        text_sentiment = gpt_analysis['sentiment_score']
+        return self.analyze_messages_sentiment([message_text])[0]
+    
+    def analyze_messages_sentiment(self, message_texts: List[str]) -> List[Dict[str, float]]:
+        columns = self.analyze_messages(message_texts)
+        return [
+            {
+                'overall_sentiment': overall_sentiment,
+                'text_sentiment': text_sentiment,
+                'emoji_sentiment': emoji_sentiment,
+                'emoji_count': emoji_count,
+                'gpt_confidence': gpt_confidence,
+                'gpt_category': gpt_category,
+                'gpt_reasoning': gpt_reasoning,
+                'gpt_analysis': gpt_analysis
+            }
+            for overall_sentiment, text_sentiment, emoji_sentiment, emoji_count,
+                gpt_confidence, gpt_category, gpt_reasoning, gpt_analysis in zip(
+                columns['overall_sentiment'].tolist(),
+                columns['text_sentiment'].tolist(),
+                columns['emoji_sentiment'].tolist(),
+                columns['emoji_count'].tolist(),
+                columns['gpt_confidence'].tolist(),
+                columns['gpt_category'].tolist(),
+                columns['gpt_reasoning'],
+                columns['gpt_analysis']
+            )
+        ]
+    
+    def analyze_messages(self, message_texts: List[str]) -> Dict[str, Any]:
+        # One array per field, aligned with message_texts
+        count = len(message_texts)
+        gpt_analyses = self.analyze_texts_sentiment_gpt(message_texts)
+        emoji_lists = [self.extract_emojis(message_text) for message_text in message_texts]
         
-        # Combine text and emoji sentiment
-        if emojis:
-            # Weight: 70% GPT text analysis, 30% emoji analysis
-            combined_sentiment = 0.7 * text_sentiment + 0.3 * emoji_sentiment
-        else:
-            # No emojis, use GPT analysis only
-            combined_sentiment = text_sentiment
+        emoji_count = np.fromiter(map(len, emoji_lists), dtype=np.int64, count=count)
+        emoji_sentiment = self.analyze_emoji_sentiments_fallback(emoji_lists)
+        text_sentiment = np.fromiter(
+            (gpt_analysis['sentiment_score'] for gpt_analysis in gpt_analyses), dtype=np.float64, count=count
+        )
         
-        # Ensure bounds
-        combined_sentiment = max(-1.0, min(1.0, combined_sentiment))
+        # Weight: 70% GPT text analysis, 30% emoji analysis; GPT only when there are no emojis
+        overall_sentiment = np.where(
+            emoji_count > 0, 0.7 * text_sentiment + 0.3 * emoji_sentiment, text_sentiment
+        ).clip(-1.0, 1.0)
         
         return {
-            'overall_sentiment': combined_sentiment,
+            'overall_sentiment': overall_sentiment,
             'text_sentiment': text_sentiment,
             'emoji_sentiment': emoji_sentiment,
-            'emoji_count': len(emojis),
-            'gpt_confidence': gpt_analysis.get('confidence', 0.0),
-            'gpt_category': gpt_analysis.get('category', 'neutral'),
-            'gpt_reasoning': gpt_analysis.get('reasoning', ''),
-            'gpt_analysis': gpt_analysis
+            'emoji_count': emoji_count,
+            'gpt_confidence': np.fromiter(
+                (gpt_analysis.get('confidence', 0.0) for gpt_analysis in gpt_analyses), dtype=np.float64, count=count
+            ),
+            'gpt_category': np.array(
+                [gpt_analysis.get('category', 'neutral') for gpt_analysis in gpt_analyses], dtype=np.str_
+            ),
+            'gpt_reasoning': [gpt_analysis.get('reasoning', '') for gpt_analysis in gpt_analyses],
+            'gpt_analysis': gpt_analyses
         }
     
     def analyze_reaction_sentiment(self, reactions: List[Dict]) -> Dict[str, float]:
-        if not reactions:
-            return {'reaction_sentiment': 0.0, 'reaction_count': 0}
-        
-        total_sentiment = 0.0
-        total_count = 0
-        
-        for reaction in reactions:
-            emoji_name = reaction.get('name', '')
-            count = reaction.get('count', 0)
-            
-            # Convert reaction name to emoji if possible
-            emoji_char = f":{emoji_name}:"
-            try:
-                emoji_char = emoji.emojize(emoji_char)
-            except:
-                pass
-            
-            sentiment = self.emoji_sentiment.get(emoji_char, 0.3)  # Default positive for reactions
-            total_sentiment += sentiment * count
-            total_count += count
-        
-        avg_sentiment = total_sentiment / total_count if total_count > 0 else 0.0
-        
-        return {
-            'reaction_sentiment': avg_sentiment,
-            'reaction_count': total_count
-        }
+        return mean_reaction_sentiment(reactions)
     
     def categorize_sentiment(self, sentiment_score: float) -> str:
-        if sentiment_score >= 0.5:
-            return 'very_positive'
-        elif sentiment_score >= 0.1:
-            return 'positive'
-        elif sentiment_score >= -0.1:
-            return 'neutral'
-        elif sentiment_score >= -0.5:
-            return 'negative'
-        else:
-            return 'very_negative'
\ No newline at end of file
+        return categorize_sentiment(sentiment_score)
+    
+    def categorize_sentiments(self, sentiment_scores: np.ndarray) -> np.ndarray:
+        return categorize_sentiments(sentiment_scores)
\ No newline at end of file
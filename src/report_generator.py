@@ -1,9 +1,98 @@
-import json
 import csv
-from datetime import datetime, timedelta
-from typing import Dict, List, Any
+import os
+import orjson
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Any, Optional, Tuple
 import logging
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from statistics import fmean
+import numpy as np
+
+from burnout_detector import RiskLevel, serialize_burnout_alerts
+from engagement_tracker import DAY_NAMES
+
+# Lower bounds of each description above the first; a score on a bound takes the higher one
+_SENTIMENT_THRESHOLDS = (-0.3, -0.1, 0.1, 0.3)
+_SENTIMENT_DESCRIPTIONS = ("very negative", "negative", "neutral", "positive", "very positive")
+_ENGAGEMENT_THRESHOLDS = (0.4, 0.7)
+_ENGAGEMENT_DESCRIPTIONS = ("low", "moderate", "high")
+
+# Per-day fields the report aggregates, in row order
+_DAILY_FIELDS = np.dtype([
+    ('message_count', np.int64),
+    ('reaction_count', np.int64),
+    ('emoji_count', np.int64),
+    ('engagement_score', np.float64),
+    ('avg_sentiment', np.float64)
+])
+
+@dataclass
+class ChannelColumns:
+    # Per-channel daily metrics as parallel arrays, sorted by date
+    dates: List[str]
+    message_count: np.ndarray
+    reaction_count: np.ndarray
+    emoji_count: np.ndarray
+    engagement_score: np.ndarray
+    avg_sentiment: np.ndarray
+    
+    @classmethod
+    def from_daily_metrics(cls, channel_metrics: Dict[str, Dict]) -> 'ChannelColumns':
+        # One walk over the day dicts fills every field at once; stored history comes
+        # back newest-first, so the rows are sorted by date once here
+        dates = np.array(list(channel_metrics))
+        order = np.argsort(dates, kind='stable')
+        rows = np.array([
+            (m['message_count'], m['reaction_count'], m['emoji_count'], m['engagement_score'], m['avg_sentiment'])
+            for m in channel_metrics.values()
+        ], dtype=_DAILY_FIELDS)[order]
+        return cls(
+            dates=dates[order].tolist(),
+            message_count=rows['message_count'],
+            reaction_count=rows['reaction_count'],
+            emoji_count=rows['emoji_count'],
+            engagement_score=rows['engagement_score'],
+            avg_sentiment=rows['avg_sentiment']
+        )
+
+@lru_cache(maxsize=512)
+def _weekday_name(date_str: str) -> Optional[str]:
+    # Every channel reports the same handful of dates, so each is parsed once.
+    # Keys not in the tracker's YYYY-MM-DD form are skipped
+    if len(date_str) != 10 or date_str[4] != '-' or date_str[7] != '-':
+        return None
+    try:
+        return DAY_NAMES[date.fromisoformat(date_str).weekday()]
+    except ValueError:
+        return None
+
+def _write_blob(filepath: Path, blob: bytes):
+    # Hand the serialized report straight to the OS, bypassing the buffered file layer
+    fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(blob)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+# The CSV summary is flushed through one large buffer
+CSV_BUFFER_BYTES = 1 << 20
+
+# Dashboard card rendered once per channel
+_CHANNEL_DETAILS_HTML = """
+            <div class="channel-details {alert_class}">
+                <h3>{channel}</h3>
+                <p><strong>Average Sentiment:</strong> {stats[avg_daily_sentiment]:.3f}</p>
+                <p><strong>Average Engagement:</strong> {stats[avg_engagement_score]:.3f}</p>
+                <p><strong>Daily Messages:</strong> {stats[avg_daily_messages]:.1f}</p>
+                <p><strong>Risk Level:</strong> {risk_level}</p>
+            </div>
+            """
 
 class ReportGenerator:
     def __init__(self, reports_dir: str = "./reports"):
@@ -16,11 +105,23 @@ class ReportGenerator:
                              engagement_trends: Dict[str, Any],
                              burnout_alerts: Dict[str, Any],
                              activity_patterns: Dict[str, Any],
-                             engagement_summary: Dict[str, Any]) -> Dict[str, Any]:
+                             engagement_summary: Dict[str, Any],
+                             include_daily: bool = True) -> Dict[str, Any]:
         
         report_date = datetime.now()
         week_start = report_date - timedelta(days=14)
         
+        # Columnize each channel once; the aggregations below reduce over these arrays
+        channel_columns = {
+            channel_name: ChannelColumns.from_daily_metrics(channel_metrics)
+            for channel_name, channel_metrics in daily_metrics.items()
+            if channel_metrics
+        }
+        
+        # Channels grouped by risk level and by sentiment trend, shared by the summary,
+        # highlights and recommendations below
+        channels_by_risk, channels_by_trend = self.group_channels(burnout_alerts, engagement_trends)
+        
         report = {
             'report_metadata': {
                 'generated_at': report_date.isoformat(),
@@ -32,20 +133,36 @@ class ReportGenerator:
                 'channels_monitored': list(daily_metrics.keys())
             },
             'executive_summary': self.generate_executive_summary(
-                engagement_summary, engagement_trends, burnout_alerts
+                engagement_summary, engagement_trends, burnout_alerts, channels_by_risk, channels_by_trend
             ),
-            'sentiment_analysis': self.generate_sentiment_analysis(daily_metrics, engagement_trends),
-            'engagement_metrics': self.generate_engagement_metrics(daily_metrics, engagement_trends),
+            'sentiment_analysis': self.generate_sentiment_analysis(daily_metrics, channel_columns, engagement_trends),
+            'engagement_metrics': self.generate_engagement_metrics(channel_columns, engagement_trends),
             'activity_patterns': activity_patterns,
-            'burnout_assessment': burnout_alerts,
-            'recommendations': self.generate_recommendations(burnout_alerts, engagement_trends),
-            'detailed_channel_metrics': self.format_channel_details(daily_metrics, engagement_trends)
+            'burnout_assessment': serialize_burnout_alerts(burnout_alerts),
+            'recommendations': self.generate_recommendations(burnout_alerts, channels_by_risk, channels_by_trend),
+            'detailed_channel_metrics': self.format_channel_details(
+                daily_metrics, channel_columns, engagement_trends, include_daily
+            )
         }
         
         return report
     
+    def group_channels(self, burnout_alerts: Dict,
+                       engagement_trends: Dict) -> Tuple[Dict[Any, List[str]], Dict[Any, List[str]]]:
+        channels_by_risk = defaultdict(list)
+        for channel_name, alert in burnout_alerts.items():
+            channels_by_risk[alert.get('risk_level')].append(channel_name)
+        
+        channels_by_trend = defaultdict(list)
+        for channel_name, trend in engagement_trends.items():
+            channels_by_trend[trend.get('sentiment_trend')].append(channel_name)
+        
+        return channels_by_risk, channels_by_trend
+    
     def generate_executive_summary(self, engagement_summary: Dict, 
-                                 engagement_trends: Dict, burnout_alerts: Dict) -> Dict[str, Any]:
+                                 engagement_trends: Dict, burnout_alerts: Dict,
+                                 channels_by_risk: Dict[Any, List[str]],
+                                 channels_by_trend: Dict[Any, List[str]]) -> Dict[str, Any]:
         
         # Calculate key metrics
         total_channels = engagement_summary.get('total_channels_monitored', 0)
@@ -53,25 +170,9 @@ class ReportGenerator:
         overall_sentiment = engagement_summary.get('overall_avg_sentiment', 0.0)
         overall_engagement = engagement_summary.get('overall_avg_engagement', 0.0)
         
-        # Sentiment classification
-        if overall_sentiment >= 0.3:
-            sentiment_description = "very positive"
-        elif overall_sentiment >= 0.1:
-            sentiment_description = "positive"
-        elif overall_sentiment >= -0.1:
-            sentiment_description = "neutral"
-        elif overall_sentiment >= -0.3:
-            sentiment_description = "negative"
-        else:
-            sentiment_description = "very negative"
-        
-        # Engagement classification
-        if overall_engagement >= 0.7:
-            engagement_description = "high"
-        elif overall_engagement >= 0.4:
-            engagement_description = "moderate"
-        else:
-            engagement_description = "low"
+        # Sentiment and engagement classification
+        sentiment_description = _SENTIMENT_DESCRIPTIONS[bisect_right(_SENTIMENT_THRESHOLDS, overall_sentiment)]
+        engagement_description = _ENGAGEMENT_DESCRIPTIONS[bisect_right(_ENGAGEMENT_THRESHOLDS, overall_engagement)]
         
         # Key insights
         insights = []
@@ -87,10 +188,8 @@ class ReportGenerator:
             insights.append(f"⚠️ Concerning negativity: {negative_pct}% of interactions are negative")
         
         # Trend insights
-        positive_trends = sum(1 for trend in engagement_trends.values() 
-                            if trend.get('sentiment_trend') == 'increasing')
-        negative_trends = sum(1 for trend in engagement_trends.values() 
-                            if trend.get('sentiment_trend') == 'decreasing')
+        positive_trends = len(channels_by_trend['increasing'])
+        negative_trends = len(channels_by_trend['decreasing'])
         
         if positive_trends > negative_trends:
             insights.append(f"📈 Improving sentiment in {positive_trends} channels")
@@ -99,8 +198,7 @@ class ReportGenerator:
         
         # Burnout insights
         if burnout_alerts:
-            high_risk = sum(1 for alert in burnout_alerts.values() 
-                          if alert.get('risk_level') == 'high')
+            high_risk = len(channels_by_risk[RiskLevel.HIGH])
             if high_risk > 0:
                 insights.append(f"🚨 {high_risk} channels showing high burnout risk")
             else:
@@ -118,10 +216,11 @@ class ReportGenerator:
             'sentiment_summary': f"Team sentiment is {sentiment_description} (score: {overall_sentiment:.2f})",
             'engagement_summary': f"Team engagement is {engagement_description} (score: {overall_engagement:.2f})",
             'key_insights': insights,
-            'weekly_highlights': self.extract_weekly_highlights(engagement_trends, burnout_alerts)
+            'weekly_highlights': self.extract_weekly_highlights(engagement_trends, burnout_alerts, channels_by_risk)
         }
     
-    def extract_weekly_highlights(self, engagement_trends: Dict, burnout_alerts: Dict) -> List[str]:
+    def extract_weekly_highlights(self, engagement_trends: Dict, burnout_alerts: Dict,
+                                  channels_by_risk: Dict[Any, List[str]]) -> List[str]:
         highlights = []
         
         # Best performing channel
@@ -142,30 +241,27 @@ class ReportGenerator:
         
         # Most concerning
         if burnout_alerts:
-            high_risk_channels = [ch for ch, alert in burnout_alerts.items() 
-                                if alert.get('risk_level') == 'high']
+            high_risk_channels = channels_by_risk[RiskLevel.HIGH]
             if high_risk_channels:
                 highlights.append(f"⚠️ Needs immediate attention: {', '.join(high_risk_channels)}")
         
         return highlights
     
-    def generate_sentiment_analysis(self, daily_metrics: Dict, engagement_trends: Dict) -> Dict[str, Any]:
+    def generate_sentiment_analysis(self, daily_metrics: Dict, channel_columns: Dict[str, ChannelColumns],
+                                    engagement_trends: Dict) -> Dict[str, Any]:
         channel_sentiments = {}
         
-        for channel_name, channel_metrics in daily_metrics.items():
-            if not channel_metrics:
-                continue
-            
-            dates = sorted(channel_metrics.keys())
-            daily_sentiments = [channel_metrics[date]['avg_sentiment'] for date in dates]
+        for channel_name, columns in channel_columns.items():
+            dates = columns.dates
+            sentiments = columns.avg_sentiment
             
             channel_sentiments[channel_name] = {
-                'daily_scores': dict(zip(dates, daily_sentiments)),
-                'weekly_average': sum(daily_sentiments) / len(daily_sentiments) if daily_sentiments else 0,
+                'daily_scores': dict(zip(dates, sentiments.tolist())),
+                'weekly_average': float(sentiments.mean()),
                 'trend': engagement_trends.get(channel_name, {}).get('sentiment_trend', 'stable'),
                 'trend_change': engagement_trends.get(channel_name, {}).get('sentiment_change', 0),
-                'best_day': dates[daily_sentiments.index(max(daily_sentiments))] if daily_sentiments else None,
-                'worst_day': dates[daily_sentiments.index(min(daily_sentiments))] if daily_sentiments else None
+                'best_day': dates[int(sentiments.argmax())],
+                'worst_day': dates[int(sentiments.argmin())]
             }
         
         return {
@@ -181,16 +277,14 @@ class ReportGenerator:
         
         for channel_metrics in daily_metrics.values():
             for date_str, metrics in channel_metrics.items():
-                try:
-                    date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-                    day_name = date_obj.strftime('%A')
+                day_name = _weekday_name(date_str)
+                if day_name is not None:
                     day_sentiments[day_name].append(metrics['avg_sentiment'])
-                except:
-                    continue
         
-        day_averages = {}
-        for day, sentiments in day_sentiments.items():
-            day_averages[day] = sum(sentiments) / len(sentiments) if sentiments else 0.0
+        day_averages = {
+            day: fmean(sentiments) if sentiments else 0.0
+            for day, sentiments in day_sentiments.items()
+        }
         
         best_day = max(day_averages.keys(), key=lambda d: day_averages[d]) if day_averages else None
         worst_day = min(day_averages.keys(), key=lambda d: day_averages[d]) if day_averages else None
@@ -203,24 +297,18 @@ class ReportGenerator:
             'friday_energy': day_averages.get('Friday', 0) > 0.2
         }
     
-    def generate_engagement_metrics(self, daily_metrics: Dict, engagement_trends: Dict) -> Dict[str, Any]:
+    def generate_engagement_metrics(self, channel_columns: Dict[str, ChannelColumns],
+                                    engagement_trends: Dict) -> Dict[str, Any]:
         channel_engagement = {}
         
-        for channel_name, channel_metrics in daily_metrics.items():
-            if not channel_metrics:
-                continue
-            
-            total_messages = sum(m['message_count'] for m in channel_metrics.values())
-            total_reactions = sum(m['reaction_count'] for m in channel_metrics.values())
-            total_emojis = sum(m['emoji_count'] for m in channel_metrics.values())
-            
-            avg_engagement = sum(m['engagement_score'] for m in channel_metrics.values()) / len(channel_metrics)
+        for channel_name, columns in channel_columns.items():
+            total_messages = int(columns.message_count.sum())
             
             channel_engagement[channel_name] = {
                 'total_messages': total_messages,
-                'total_reactions': total_reactions,
-                'total_emojis': total_emojis,
-                'average_engagement_score': round(avg_engagement, 3),
+                'total_reactions': int(columns.reaction_count.sum()),
+                'total_emojis': int(columns.emoji_count.sum()),
+                'average_engagement_score': round(float(columns.engagement_score.mean()), 3),
                 'trend': engagement_trends.get(channel_name, {}).get('engagement_trend', 'stable'),
                 'messages_per_day': round(total_messages / 7, 1)
             }
@@ -232,12 +320,12 @@ class ReportGenerator:
                                        reverse=True)
         }
     
-    def generate_recommendations(self, burnout_alerts: Dict, engagement_trends: Dict) -> List[str]:
+    def generate_recommendations(self, burnout_alerts: Dict, channels_by_risk: Dict[Any, List[str]],
+                                 channels_by_trend: Dict[Any, List[str]]) -> List[str]:
         recommendations = []
         
         # High priority burnout recommendations
-        high_risk_channels = [ch for ch, alert in burnout_alerts.items() 
-                            if alert.get('risk_level') == 'high']
+        high_risk_channels = channels_by_risk[RiskLevel.HIGH]
         
         if high_risk_channels:
             recommendations.extend([
@@ -247,8 +335,7 @@ class ReportGenerator:
             ])
         
         # Medium risk recommendations
-        medium_risk_channels = [ch for ch, alert in burnout_alerts.items() 
-                              if alert.get('risk_level') == 'medium']
+        medium_risk_channels = channels_by_risk[RiskLevel.MEDIUM]
         
         if medium_risk_channels:
             recommendations.append(
@@ -256,8 +343,7 @@ class ReportGenerator:
             )
         
         # Trend-based recommendations
-        declining_channels = [ch for ch, trend in engagement_trends.items() 
-                            if trend.get('sentiment_trend') == 'decreasing']
+        declining_channels = channels_by_trend['decreasing']
         
         if declining_channels:
             recommendations.append(
@@ -273,27 +359,23 @@ class ReportGenerator:
         
         return recommendations[:10]  # Limit to top 10 recommendations
     
-    def format_channel_details(self, daily_metrics: Dict, engagement_trends: Dict) -> Dict[str, Any]:
+    def format_channel_details(self, daily_metrics: Dict, channel_columns: Dict[str, ChannelColumns],
+                               engagement_trends: Dict, include_daily: bool = True) -> Dict[str, Any]:
         detailed_metrics = {}
         
-        for channel_name, channel_metrics in daily_metrics.items():
-            if not channel_metrics:
-                continue
-            
-            dates = sorted(channel_metrics.keys())
-            
-            detailed_metrics[channel_name] = {
-                'daily_breakdown': channel_metrics,
-                'summary_stats': {
-                    'total_days_analyzed': len(dates),
-                    'avg_daily_messages': sum(m['message_count'] for m in channel_metrics.values()) / len(channel_metrics),
-                    'avg_daily_sentiment': sum(m['avg_sentiment'] for m in channel_metrics.values()) / len(channel_metrics),
-                    'avg_engagement_score': sum(m['engagement_score'] for m in channel_metrics.values()) / len(channel_metrics),
-                    'total_emoji_usage': sum(m['emoji_count'] for m in channel_metrics.values()),
-                    'total_reactions': sum(m['reaction_count'] for m in channel_metrics.values())
-                },
-                'trends': engagement_trends.get(channel_name, {})
+        for channel_name, columns in channel_columns.items():
+            # The breakdown is the tracker's own dict, shared rather than copied; it dominates the JSON size
+            channel_details = {'daily_breakdown': daily_metrics[channel_name]} if include_daily else {}
+            channel_details['summary_stats'] = {
+                'total_days_analyzed': len(columns.dates),
+                'avg_daily_messages': float(columns.message_count.mean()),
+                'avg_daily_sentiment': float(columns.avg_sentiment.mean()),
+                'avg_engagement_score': float(columns.engagement_score.mean()),
+                'total_emoji_usage': int(columns.emoji_count.sum()),
+                'total_reactions': int(columns.reaction_count.sum())
             }
+            channel_details['trends'] = engagement_trends.get(channel_name, {})
+            detailed_metrics[channel_name] = channel_details
         
         return detailed_metrics
     
@@ -304,8 +386,11 @@ class ReportGenerator:
             filename = f"engagement_report_{timestamp}.json"
             filepath = self.reports_dir / filename
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(report, f, indent=2, ensure_ascii=False, default=str)
+            _write_blob(filepath, orjson.dumps(
+                report,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+                default=str
+            ))
         
         elif format_type == 'csv':
             filename = f"engagement_summary_{timestamp}.csv"
@@ -323,7 +408,20 @@ class ReportGenerator:
         return str(filepath)
     
     def save_csv_summary(self, report: Dict[str, Any], filepath: Path):
-        with open(filepath, 'w', newline='', encoding='utf-8') as f:
+        burnout_assessment = report.get('burnout_assessment', {})
+        rows = [
+            [
+                channel,
+                round(details['summary_stats']['avg_daily_sentiment'], 3),
+                round(details['summary_stats']['avg_engagement_score'], 3),
+                int(details['summary_stats']['avg_daily_messages'] * 7),  # Weekly total
+                details['trends'].get('sentiment_trend', 'stable'),
+                burnout_assessment.get(channel, {}).get('risk_level', 'low')
+            ]
+            for channel, details in report.get('detailed_channel_metrics', {}).items()
+        ]
+        
+        with open(filepath, 'w', newline='', encoding='utf-8', buffering=CSV_BUFFER_BYTES) as f:
             writer = csv.writer(f)
             
             # Write header
@@ -331,17 +429,7 @@ class ReportGenerator:
                            'Total_Messages', 'Sentiment_Trend', 'Risk_Level'])
             
             # Write channel data
-            for channel, details in report.get('detailed_channel_metrics', {}).items():
-                burnout_info = report.get('burnout_assessment', {}).get(channel, {})
-                
-                writer.writerow([
-                    channel,
-                    round(details['summary_stats']['avg_daily_sentiment'], 3),
-                    round(details['summary_stats']['avg_engagement_score'], 3),
-                    int(details['summary_stats']['avg_daily_messages'] * 7),  # Weekly total
-                    details['trends'].get('sentiment_trend', 'stable'),
-                    burnout_info.get('risk_level', 'low')
-                ])
+            writer.writerows(rows)
     
     def save_html_dashboard(self, report: Dict[str, Any], filepath: Path):
         html_template = """<!DOCTYPE html>
@@ -412,20 +500,16 @@ class ReportGenerator:
         insights_html = "<ul>" + "".join([f"<li>{insight}</li>" for insight in summary['key_insights']]) + "</ul>"
         recommendations_html = "<ul>" + "".join([f"<li>{rec}</li>" for rec in report['recommendations']]) + "</ul>"
         
-        channel_details_html = ""
+        channel_parts = []
         for channel, details in report['detailed_channel_metrics'].items():
             risk_level = report.get('burnout_assessment', {}).get(channel, {}).get('risk_level', 'low')
-            alert_class = f"alert-{risk_level}"
-            
-            channel_details_html += f"""
-            <div class="channel-details {alert_class}">
-                <h3>{channel}</h3>
-                <p><strong>Average Sentiment:</strong> {details['summary_stats']['avg_daily_sentiment']:.3f}</p>
-                <p><strong>Average Engagement:</strong> {details['summary_stats']['avg_engagement_score']:.3f}</p>
-                <p><strong>Daily Messages:</strong> {details['summary_stats']['avg_daily_messages']:.1f}</p>
-                <p><strong>Risk Level:</strong> {risk_level.upper()}</p>
-            </div>
-            """
+            channel_parts.append(_CHANNEL_DETAILS_HTML.format(
+                channel=channel,
+                alert_class=f"alert-{risk_level}",
+                stats=details['summary_stats'],
+                risk_level=risk_level.upper()
+            ))
+        channel_details_html = "".join(channel_parts)
         
         # Fill template
         html_content = html_template.format(
@@ -438,5 +522,4 @@ class ReportGenerator:
             channel_details=channel_details_html
         )
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(html_content)
\ No newline at end of file
+        filepath.write_text(html_content, encoding='utf-8')
\ No newline at end of file
@@ -1,21 +1,34 @@
-import re
-import emoji
+from collections import OrderedDict
+import numpy as np
 from textblob import TextBlob
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional
 import logging
 import os
 
+from text_utils import (
+    categorize_sentiment, clean_text_for_analysis, extract_emojis,
+    mean_emoji_sentiment, mean_emoji_sentiments, mean_reaction_sentiment
+)
+
+# VADER/TextBlob scores depend only on the text, and Slack repeats itself ("+1", "lgtm", bot posts)
+VADER_CACHE_SIZE = 50000
+
+# Weights of the text and emoji scores in the combined sentiment
+TEXT_WEIGHT = 0.6
+EMOJI_WEIGHT = 0.4
+
 class SentimentAnalyzer:
-    def __init__(self, use_gpt: bool = True):
+    def __init__(self, use_gpt: bool = True, gpt_cache_path: Optional[str] = None):
         self.use_gpt = use_gpt and os.getenv('OPENAI_API_KEY') is not None
         self.vader = SentimentIntensityAnalyzer()
+        self.vader_cache = OrderedDict()
         self.logger = logging.getLogger(__name__)
         
         if self.use_gpt:
             try:
                 from gpt_sentiment_analyzer import GPTSentimentAnalyzer
-                self.gpt_analyzer = GPTSentimentAnalyzer()
+                self.gpt_analyzer = GPTSentimentAnalyzer(result_cache_path=gpt_cache_path)
                 self.logger.info("Initialized GPT-based sentiment analysis")
             except Exception as e:
                 self.logger.warning(f"Failed to initialize GPT analyzer, falling back to VADER: {e}")
@@ -24,52 +37,18 @@ class SentimentAnalyzer:
         else:
             self.gpt_analyzer = None
             self.logger.info("Using VADER/TextBlob sentiment analysis (GPT disabled or API key missing)")
-        
-        # Emoji sentiment mapping
-        self.emoji_sentiment = {
-            '😊': 0.8, '😀': 0.8, '😃': 0.8, '😄': 0.8, '😁': 0.8,
-            '😆': 0.7, '😂': 0.9, '🤣': 0.9, '😇': 0.6, '🙂': 0.5,
-            '😉': 0.5, '😋': 0.6, '😎': 0.7, '🤗': 0.8, '🤩': 0.9,
-            '😍': 0.9, '🥰': 0.9, '😘': 0.8, '😗': 0.6, '☺️': 0.6,
-            '😌': 0.4, '😏': 0.3, '🤔': 0.1, '🙄': -0.3, '😒': -0.4,
-            '😔': -0.6, '😞': -0.7, '😟': -0.6, '😢': -0.8, '😭': -0.9,
-            '😤': -0.5, '😠': -0.7, '😡': -0.8, '🤬': -0.9, '😰': -0.6,
-            '😨': -0.7, '😱': -0.8, '😪': -0.4, '🙃': 0.2, '😶': 0.0,
-            '🤐': -0.1, '😐': 0.0, '😑': -0.1, '🤨': -0.2, '🧐': 0.1,
-            '🤯': -0.3, '😵': -0.5, '🥴': -0.2, '🤮': -0.8, '🤢': -0.6,
-            '🤧': -0.3, '😷': -0.2, '🤒': -0.4, '🤕': -0.5, '👍': 0.6,
-            '👎': -0.6, '👏': 0.7, '🙌': 0.8, '👌': 0.5, '✨': 0.6,
-            '🎉': 0.9, '🎊': 0.8, '💪': 0.7, '🔥': 0.8, '⭐': 0.6,
-            '💯': 0.8, '✅': 0.6, '❌': -0.5, '⚠️': -0.3, '🚨': -0.6,
-            '💔': -0.8, '❤️': 0.9, '💕': 0.8, '💖': 0.8, '💗': 0.8,
-            '😴': -0.1, '💤': -0.1, '🤤': 0.1, '😻': 0.8, '💀': -0.7
-        }
     
     def extract_emojis(self, text: str) -> List[str]:
-        return [char for char in text if char in emoji.EMOJI_DATA]
+        return extract_emojis(text)
     
     def analyze_emoji_sentiment(self, emojis: List[str]) -> float:
-        if not emojis:
-            return 0.0
-        
-        sentiment_scores = [
-            self.emoji_sentiment.get(em, 0.0) for em in emojis
-        ]
-        
-        return sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else 0.0
+        return mean_emoji_sentiment(emojis)
+    
+    def analyze_emoji_sentiments(self, emoji_lists: List[List[str]]) -> np.ndarray:
+        return mean_emoji_sentiments(emoji_lists)
     
     def clean_text_for_analysis(self, text: str) -> str:
-        # Remove URLs
-        text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
-        # Remove user mentions
-        text = re.sub(r'<@[UW][A-Z0-9]+(?:\|[^>]+)?>', '', text)
-        # Remove channel mentions
-        text = re.sub(r'<#[C][A-Z0-9]+(?:\|[^>]+)?>', '', text)
-        # Remove special Slack formatting
-        text = re.sub(r'<[^>]+>', '', text)
-        # Remove excess whitespace
-        text = ' '.join(text.split())
-        return text.strip()
+        return clean_text_for_analysis(text)
     
     def analyze_text_sentiment_vader(self, text: str) -> Dict[str, float]:
         clean_text = self.clean_text_for_analysis(text)
@@ -94,39 +73,118 @@ class SentimentAnalyzer:
         if self.use_gpt and self.gpt_analyzer:
             # Use GPT-based analysis
             try:
-                gpt_result = self.gpt_analyzer.analyze_message_sentiment(message_text)
-                # Add fallback scores for compatibility
-                gpt_result.update({
-                    'vader_pos': 0.0,
-                    'vader_neg': 0.0, 
-                    'vader_neu': 1.0,
-                    'textblob_polarity': gpt_result['text_sentiment'],
-                    'textblob_subjectivity': 0.5,
-                    'analysis_method': 'gpt'
-                })
-                return gpt_result
+                return self.add_compat_scores(self.gpt_analyzer.analyze_message_sentiment(message_text))
             except Exception as e:
                 self.logger.error(f"GPT analysis failed, falling back to VADER: {e}")
                 # Fall through to VADER analysis
         
-        # Fallback to VADER/TextBlob analysis
-        emojis = self.extract_emojis(message_text)
-        emoji_sentiment = self.analyze_emoji_sentiment(emojis)
+        return self.analyze_message_sentiment_vader(message_text)
+    
+    def analyze_messages_sentiment(self, message_texts: List[str]) -> List[Dict[str, float]]:
+        if self.use_gpt and self.gpt_analyzer:
+            # Batched prompts: one GPT request covers many messages
+            try:
+                return [
+                    self.add_compat_scores(gpt_result)
+                    for gpt_result in self.gpt_analyzer.analyze_messages_sentiment(message_texts)
+                ]
+            except Exception as e:
+                self.logger.error(f"GPT batch analysis failed, falling back to VADER: {e}")
         
-        vader_scores = self.analyze_text_sentiment_vader(message_text)
-        textblob_scores = self.analyze_text_sentiment_textblob(message_text)
+        return self.analyze_messages_sentiment_vader(message_texts)
+    
+    def analyze_messages_sentiment_offline(self, message_texts: List[str]) -> List[Dict[str, float]]:
+        # Backfills only: blocks on the Batch API and has no VADER fallback to mix in
+        if not (self.use_gpt and self.gpt_analyzer):
+            raise RuntimeError("Offline sentiment backfill requires GPT (set OPENAI_API_KEY)")
         
-        # Combine scores with weights
-        text_weight = 0.6
-        emoji_weight = 0.4
+        return [
+            self.add_compat_scores(gpt_result)
+            for gpt_result in self.gpt_analyzer.analyze_texts_sentiment_offline(message_texts)
+        ]
+    
+    def add_compat_scores(self, gpt_result: Dict[str, float]) -> Dict[str, float]:
+        # Add fallback scores for compatibility
+        gpt_result.update({
+            'vader_pos': 0.0,
+            'vader_neg': 0.0, 
+            'vader_neu': 1.0,
+            'textblob_polarity': gpt_result['text_sentiment'],
+            'textblob_subjectivity': 0.5,
+            'analysis_method': 'gpt'
+        })
+        return gpt_result
+    
+    def analyze_message_sentiment_vader(self, message_text: str) -> Dict[str, float]:
+        cached = self.vader_cache.get(message_text)
+        if cached is None:
+            cached = self.score_message_vader(message_text)
+            self.remember_vader_result(message_text, cached)
+        else:
+            self.vader_cache.move_to_end(message_text)
         
+        # Callers merge reaction scores into the result, so hand out a copy
+        return {**cached}
+    
+    def analyze_messages_sentiment_vader(self, message_texts: List[str]) -> List[Dict[str, float]]:
+        results = [None] * len(message_texts)
+        pending = {}
+        for i, message_text in enumerate(message_texts):
+            cached = self.vader_cache.get(message_text)
+            if cached is not None:
+                self.vader_cache.move_to_end(message_text)
+                results[i] = {**cached}
+            else:
+                pending.setdefault(message_text, []).append(i)
+        
+        if not pending:
+            return results
+        
+        # Score each distinct new text once, then combine the whole batch in one vectorized step
+        emoji_lists = [self.extract_emojis(message_text) for message_text in pending]
+        emoji_sentiments = self.analyze_emoji_sentiments(emoji_lists)
+        scored = [
+            self.score_message_parts(message_text, emojis, emoji_sentiment)
+            for message_text, emojis, emoji_sentiment in zip(pending, emoji_lists, emoji_sentiments.tolist())
+        ]
+        combined = np.clip(
+            TEXT_WEIGHT * np.fromiter((r['text_sentiment'] for r in scored), dtype=np.float64, count=len(scored)) +
+            EMOJI_WEIGHT * emoji_sentiments,
+            -1.0, 1.0
+        )
+        
+        for (message_text, indices), result, overall in zip(pending.items(), scored, combined.tolist()):
+            result['overall_sentiment'] = overall
+            self.remember_vader_result(message_text, result)
+            for i in indices:
+                results[i] = {**result}
+        
+        return results
+    
+    def remember_vader_result(self, message_text: str, result: Dict[str, float]):
+        self.vader_cache[message_text] = result
+        if len(self.vader_cache) > VADER_CACHE_SIZE:
+            self.vader_cache.popitem(last=False)
+    
+    def score_message_vader(self, message_text: str) -> Dict[str, float]:
+        emojis = self.extract_emojis(message_text)
+        result = self.score_message_parts(message_text, emojis, self.analyze_emoji_sentiment(emojis))
+        
+        # Combine scores with weights
         combined_sentiment = (
-            text_weight * vader_scores['compound'] + 
-            emoji_weight * emoji_sentiment
+            TEXT_WEIGHT * result['text_sentiment'] + 
+            EMOJI_WEIGHT * result['emoji_sentiment']
         )
+        result['overall_sentiment'] = max(-1.0, min(1.0, combined_sentiment))
+        return result
+    
+    def score_message_parts(self, message_text: str, emojis: List[str], emoji_sentiment: float) -> Dict[str, float]:
+        # VADER/TextBlob analysis; overall_sentiment is filled in once the scores are combined
+        vader_scores = self.analyze_text_sentiment_vader(message_text)
+        textblob_scores = self.analyze_text_sentiment_textblob(message_text)
         
         return {
-            'overall_sentiment': max(-1.0, min(1.0, combined_sentiment)),
+            'overall_sentiment': 0.0,
             'text_sentiment': vader_scores['compound'],
             'emoji_sentiment': emoji_sentiment,
             'emoji_count': len(emojis),
@@ -139,42 +197,7 @@ class SentimentAnalyzer:
         }
     
     def analyze_reaction_sentiment(self, reactions: List[Dict]) -> Dict[str, float]:
-        if not reactions:
-            return {'reaction_sentiment': 0.0, 'reaction_count': 0}
-        
-        total_sentiment = 0.0
-        total_count = 0
-        
-        for reaction in reactions:
-            emoji_name = reaction.get('name', '')
-            count = reaction.get('count', 0)
-            
-            # Convert reaction name to emoji if possible
-            emoji_char = f":{emoji_name}:"
-            try:
-                emoji_char = emoji.emojize(emoji_char)
-            except:
-                pass
-            
-            sentiment = self.emoji_sentiment.get(emoji_char, 0.3)  # Default positive for reactions
-            total_sentiment += sentiment * count
-            total_count += count
-        
-        avg_sentiment = total_sentiment / total_count if total_count > 0 else 0.0
-        
-        return {
-            'reaction_sentiment': avg_sentiment,
-            'reaction_count': total_count
-        }
+        return mean_reaction_sentiment(reactions)
     
     def categorize_sentiment(self, sentiment_score: float) -> str:
-        if sentiment_score >= 0.5:
-            return 'very_positive'
-        elif sentiment_score >= 0.1:
-            return 'positive'
-        elif sentiment_score >= -0.1:
-            return 'neutral'
-        elif sentiment_score >= -0.5:
-            return 'negative'
-        else:
-            return 'very_negative'
\ No newline at end of file
+        return categorize_sentiment(sentiment_score)
\ No newline at end of file
@@ -0,0 +1,69 @@
+import hashlib
+import sqlite3
+import threading
+from typing import Any, Dict, List, Tuple
+import logging
+import orjson
+from pathlib import Path
+
+_SCHEMA_SQL = '''
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+
+CREATE TABLE IF NOT EXISTS gpt_results (
+    key BLOB PRIMARY KEY,
+    result BLOB NOT NULL
+) WITHOUT ROWID;
+'''
+
+_SELECT_RESULTS = 'SELECT key, result FROM gpt_results WHERE key IN ({})'
+_INSERT_RESULT = 'INSERT OR REPLACE INTO gpt_results (key, result) VALUES (?, ?)'
+
+# Stay well under SQLite's bound-parameter limit
+_LOOKUP_CHUNK = 500
+
+class SentimentResultCache:
+    def __init__(self, db_path: str, namespace: str):
+        self.db_path = Path(db_path)
+        # Folded into every key, so a model or prompt change starts a fresh cache
+        self.namespace = namespace.encode('utf-8') + b'\0'
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.executescript(_SCHEMA_SQL)
+    
+    def _hash(self, key: str) -> bytes:
+        return hashlib.blake2b(self.namespace + key.encode('utf-8'), digest_size=16).digest()
+    
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        hashed = {self._hash(key): key for key in keys}
+        digests = list(hashed)
+        found = {}
+        
+        with self._lock:
+            for start in range(0, len(digests), _LOOKUP_CHUNK):
+                chunk = digests[start:start + _LOOKUP_CHUNK]
+                rows = self._conn.execute(_SELECT_RESULTS.format(', '.join('?' * len(chunk))), chunk)
+                for digest, result in rows:
+                    found[hashed[digest]] = orjson.loads(result)
+        
+        return found
+    
+    def set_many(self, items: List[Tuple[str, Dict[str, Any]]]):
+        rows = [(self._hash(key), orjson.dumps(result)) for key, result in items]
+        
+        with self._lock:
+            try:
+                self._conn.execute('BEGIN')
+                self._conn.executemany(_INSERT_RESULT, rows)
+                self._conn.execute('COMMIT')
+            except sqlite3.Error as e:
+                if self._conn.in_transaction:
+                    self._conn.execute('ROLLBACK')
+                self.logger.warning(f"Failed to persist {len(rows)} GPT results: {e}")
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
\ No newline at end of file
@@ -1,123 +1,365 @@
 import os
+import ssl
+import threading
 import time
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Dict, Any, Iterator, Optional, Tuple
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 import logging
+import orjson
+
+# Channel histories fetched at once; each fetch is a serial chain of paged requests
+CHANNEL_FETCH_CONCURRENCY = 4
+
+# conversations.list page size; Slack throttles unbounded listings harder
+CHANNEL_LIST_PAGE_SIZE = 1000
+
+# Slack web API tiers as (requests per minute, burst) for each method the collector calls
+SLACK_METHOD_LIMITS = {
+    'auth.test': (100, 10),
+    'conversations.list': (20, 3),
+    'conversations.history': (50, 5),
+}
+
+# Write buffer for JSONL exports
+JSONL_BUFFER_BYTES = 1 << 20
+
+# Attempts after the first for a throttled or failing call; waits double from the base unless Slack sends Retry-After
+MAX_RETRIES = 3
+RETRY_BASE_DELAY = 1.0
+
+# In-process memo of channel lookups, on top of the on-disk channel cache
+CHANNEL_MEMO_TTL = 3600
+CHANNEL_MEMO_SIZE = 32
+
+# Message subtypes a person wrote; every other subtype is a system event (joins, pins, deletions, bot posts)
+_HUMAN_SUBTYPES = frozenset({None, "thread_broadcast", "file_share", "me_message"})
+
+def _window_start(days_back: int) -> str:
+    # Whole seconds, so concurrent callers asking for the same window resolve the same bound
+    return str(int(time.time()) - days_back * 86400)
+
+def _header(headers: Optional[Dict[str, Any]], name: str) -> Optional[str]:
+    # HTTP header names are case-insensitive, and the SDK hands back whatever casing the server sent
+    name = name.lower()
+    for key, value in (headers or {}).items():
+        if key.lower() == name:
+            return value[0] if isinstance(value, list) else value
+    return None
+
+def _keep_message(msg: Dict[str, Any], _get=dict.get) -> bool:
+    # Cheapest rejections first; isspace avoids building a stripped copy of every text
+    if _get(msg, "bot_id") or _get(msg, "subtype") not in _HUMAN_SUBTYPES or _get(msg, "type") != "message":
+        return False
+    text = _get(msg, "text")
+    return bool(text) and not text.isspace()
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Reserve the token up front; a negative balance is the wait this caller owes
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        
+        if wait > 0:
+            time.sleep(wait)
 
 class SlackDataCollector:
-    def __init__(self, token: str, rate_limit_delay: float = 1.0):
-        self.client = WebClient(token=token)
+    def __init__(self, token: str, rate_limit_delay: float = 1.0,
+                 cache_dir: Optional[str] = None, channel_cache_ttl: int = 86400):
+        # One SSL context for every request; urllib would otherwise load the CA bundle per call
+        self.client = WebClient(token=token, ssl=ssl.create_default_context())
         self.rate_limit_delay = rate_limit_delay
+        self.channel_cache_ttl = channel_cache_ttl
+        self.channel_cache_path = Path(cache_dir) / 'slack_channels.json' if cache_dir else None
+        self.channels_memo: Dict[Tuple[str, ...], Tuple[float, Dict[str, str]]] = {}
+        self.channels_memo_lock = threading.Lock()
+        self.inflight_history: Dict[Tuple[str, str], Future] = {}
+        self.inflight_lock = threading.Lock()
         self.logger = logging.getLogger(__name__)
         
-    def get_channels(self, channel_names: List[str]) -> Dict[str, str]:
+        # Calls only wait once a method's bucket runs dry; rate_limit_delay still caps the sustained rate
+        self.rate_limits = {}
+        for method, (per_minute, burst) in SLACK_METHOD_LIMITS.items():
+            rate = per_minute / 60
+            if rate_limit_delay > 0:
+                rate = min(rate, 1 / rate_limit_delay)
+            self.rate_limits[method] = TokenBucket(rate, burst)
+    
+    def throttle(self, method: str):
+        self.rate_limits[method].acquire()
+    
+    def call(self, method: str, fn, **kwargs):
+        delay = RETRY_BASE_DELAY
+        for attempt in range(MAX_RETRIES + 1):
+            self.throttle(method)
+            try:
+                return fn(**kwargs)
+            except SlackApiError as e:
+                status = getattr(e.response, 'status_code', None) or 0
+                # Only rate limits and server errors are worth another attempt
+                if attempt == MAX_RETRIES or not (status == 429 or status >= 500):
+                    raise
+                
+                retry_after = _header(e.response.headers, 'Retry-After')
+                wait = float(retry_after) if retry_after else delay
+                self.logger.warning(f"{method} failed with HTTP {status}, retrying in {wait:.1f}s")
+                time.sleep(wait)
+                delay *= 2
+    
+    def get_channels(self, channel_names: List[str], force_refresh: bool = False) -> Dict[str, str]:
+        key = tuple(sorted(channel_names))
+        memo_ttl = min(CHANNEL_MEMO_TTL, self.channel_cache_ttl)
+        now = time.monotonic()
+        
+        if not force_refresh and memo_ttl > 0:
+            with self.channels_memo_lock:
+                entry = self.channels_memo.get(key)
+            if entry is not None and now - entry[0] < memo_ttl:
+                mapping = entry[1]
+                return {name: mapping[name] for name in channel_names if name in mapping}
+        
+        cached = {} if force_refresh else self.load_channel_cache()
+        missing = [name for name in channel_names if name not in cached]
+        
+        if missing:
+            fetched = self.fetch_channels(missing)
+            if fetched:
+                cached = {**cached, **fetched}
+                self.save_channel_cache(cached)
+        
+        channels = {name: cached[name] for name in channel_names if name in cached}
+        
+        # A failed lookup comes back empty and is not worth remembering
+        if memo_ttl > 0 and channels:
+            with self.channels_memo_lock:
+                self.channels_memo.pop(key, None)
+                if len(self.channels_memo) >= CHANNEL_MEMO_SIZE:
+                    # Entries are kept in insertion order, so the first one is the oldest
+                    self.channels_memo.pop(next(iter(self.channels_memo)))
+                self.channels_memo[key] = (now, dict(channels))
+        
+        return channels
+    
+    def load_channel_cache(self) -> Dict[str, str]:
+        if self.channel_cache_path is None or self.channel_cache_ttl <= 0:
+            return {}
+        
+        path = self.channel_cache_path
+        try:
+            if time.time() - path.stat().st_mtime > self.channel_cache_ttl:
+                return {}
+            return orjson.loads(path.read_bytes())
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable channel cache {path.name}: {e}")
+            return {}
+    
+    def save_channel_cache(self, channels: Dict[str, str]):
+        if self.channel_cache_path is None or self.channel_cache_ttl <= 0:
+            return
+        
+        path = self.channel_cache_path
+        tmp_path = path.with_suffix('.tmp')
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(orjson.dumps(channels))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            self.logger.warning(f"Failed to write channel cache: {e}")
+    
+    def fetch_channels(self, channel_names: List[str]) -> Dict[str, str]:
+        wanted = frozenset(channel_names)
         try:
-            response = self.client.conversations_list(types="public_channel,private_channel")
             channels = {}
+            cursor = None
             
-            for channel in response["channels"]:
-                channel_name = f"#{channel['name']}"
-                if channel_name in channel_names:
-                    channels[channel_name] = channel["id"]
+            while True:
+                response = self.call(
+                    'conversations.list',
+                    self.client.conversations_list,
+                    types="public_channel,private_channel",
+                    limit=CHANNEL_LIST_PAGE_SIZE,
+                    cursor=cursor
+                )
+                
+                for channel in response["channels"]:
+                    channel_name = f"#{channel['name']}"
+                    if channel_name in wanted:
+                        channels[channel_name] = channel["id"]
+                
+                # Stop paging as soon as every requested channel has been seen
+                if len(channels) == len(wanted):
+                    break
+                
+                cursor = response.get("response_metadata", {}).get("next_cursor")
+                if not cursor:
+                    break
             
-            # Handle private channels that may not appear in conversations_list
-            # Try to find missing channels by testing direct access
-            missing_channels = [name for name in channel_names if name not in channels]
+            # The listing already covers private channels the bot belongs to, so anything left is unreachable
+            missing_channels = wanted - channels.keys()
             if missing_channels:
-                self.logger.info(f"Trying direct lookup for missing channels: {missing_channels}")
-                
-                # Try private channels specifically
-                try:
-                    priv_response = self.client.conversations_list(types="private_channel", limit=100)
-                    for channel in priv_response["channels"]:
-                        channel_name = f"#{channel['name']}"
-                        if channel_name in missing_channels:
-                            channels[channel_name] = channel["id"]
-                            self.logger.info(f"Found private channel: {channel_name}")
-                except SlackApiError as e:
-                    self.logger.warning(f"Could not fetch private channels: {e}")
+                self.logger.warning(f"Channels not found or bot not a member: {sorted(missing_channels)}")
             
-            time.sleep(self.rate_limit_delay)
             return channels
         except SlackApiError as e:
             self.logger.error(f"Error fetching channels: {e}")
             return {}
     
-    def get_channel_history(self, channel_id: str, days_back: int = 7) -> List[Dict[str, Any]]:
-        oldest_timestamp = (datetime.now() - timedelta(days=days_back)).timestamp()
-        messages = []
+    def make_history_fetcher(self, days_back: int) -> Callable[[str], List[Dict[str, Any]]]:
+        # Fix the window start once so every channel in a batch shares it
+        oldest = _window_start(days_back)
+        
+        def fetch(channel_id: str) -> List[Dict[str, Any]]:
+            return self.get_channel_history(channel_id, days_back, oldest)
+        
+        return fetch
+    
+    def get_channel_history(self, channel_id: str, days_back: int = 7,
+                            oldest: Optional[str] = None) -> List[Dict[str, Any]]:
+        if oldest is None:
+            oldest = _window_start(days_back)
+        
+        # Concurrent requests for the same channel and window share a single scan
+        key = (channel_id, oldest)
+        with self.inflight_lock:
+            future = self.inflight_history.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self.inflight_history[key] = future
+        
+        if not leader:
+            return list(future.result())
+        
+        try:
+            messages = list(self.iter_channel_history(channel_id, days_back, oldest))
+            future.set_result(messages)
+            return messages
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.inflight_lock:
+                self.inflight_history.pop(key, None)
+    
+    def iter_channel_history(self, channel_id: str, days_back: int = 7, oldest: Optional[str] = None,
+                             raise_errors: bool = False) -> Iterator[Dict[str, Any]]:
+        # Yield messages page by page so callers never need more than one page in memory
+        if oldest is None:
+            oldest = _window_start(days_back)
+        params = {'channel': channel_id, 'oldest': oldest, 'limit': 200}
         
         try:
             cursor = None
             while True:
-                response = self.client.conversations_history(
-                    channel=channel_id,
-                    oldest=str(oldest_timestamp),
+                response = self.call(
+                    'conversations.history',
+                    self.client.conversations_history,
                     cursor=cursor,
-                    limit=200
+                    **params
                 )
                 
-                batch_messages = response.get("messages", [])
-                
                 # Filter out bot messages and system notifications
-                filtered_messages = [
-                    msg for msg in batch_messages 
-                    if not msg.get("bot_id") and 
-                       msg.get("type") == "message" and 
-                       msg.get("subtype") is None and
-                       msg.get("text", "").strip()
-                ]
-                
-                messages.extend(filtered_messages)
+                for msg in response.get("messages", []):
+                    if _keep_message(msg):
+                        yield msg
                 
                 if not response.get("has_more", False):
                     break
                     
                 cursor = response.get("response_metadata", {}).get("next_cursor")
-                time.sleep(self.rate_limit_delay)
-            
-            return messages
         except SlackApiError as e:
             self.logger.error(f"Error fetching channel history for {channel_id}: {e}")
-            return []
+            # Callers that persist the stream must not mistake a cut-off history for a full one
+            if raise_errors:
+                raise
     
-    def get_message_reactions(self, channel_id: str, timestamp: str) -> List[Dict[str, Any]]:
+    def iter_channel_data(self, channel_names: List[str], days_back: int = 7) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        # Yield (channel_name, messages) in channel order as each channel finishes so callers can start on it
+        channels = self.get_channels(channel_names)
+        if not channels:
+            return
+        
+        fetch = self.make_history_fetcher(days_back)
+        
+        # Fetches are network-bound, so several channels page through their history side by side
+        executor = ThreadPoolExecutor(
+            max_workers=min(CHANNEL_FETCH_CONCURRENCY, len(channels)),
+            thread_name_prefix='slack-history'
+        )
         try:
-            response = self.client.reactions_get(
-                channel=channel_id,
-                timestamp=timestamp,
-                full=True
-            )
-            time.sleep(self.rate_limit_delay)
-            return response.get("message", {}).get("reactions", [])
-        except SlackApiError as e:
-            self.logger.error(f"Error fetching reactions: {e}")
-            return []
+            futures = [
+                (channel_name, executor.submit(self.collect_channel_messages, channel_name, channel_id, fetch))
+                for channel_name, channel_id in channels.items()
+            ]
+            for channel_name, future in futures:
+                yield channel_name, future.result()
+        finally:
+            # A consumer that stops early should not wait on channels it will never read;
+            # fetches already running finish on their worker threads and are discarded
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def collect_channel_messages(self, channel_name: str, channel_id: str,
+                                 fetch: Callable[[str], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        self.logger.info(f"Collecting data from {channel_name}")
+        messages = fetch(channel_id)
+        
+        # conversations.history already inlines each message's reactions; Slack omits the key when there are none
+        for message in messages:
+            message.setdefault("reactions", [])
+        
+        self.logger.info(f"Collected {len(messages)} messages from {channel_name}")
+        return messages
     
     def collect_channel_data(self, channel_names: List[str], days_back: int = 7) -> Dict[str, List[Dict[str, Any]]]:
-        channels = self.get_channels(channel_names)
-        channel_data = {}
+        return dict(self.iter_channel_data(channel_names, days_back))
+    
+    def stream_to_jsonl(self, channel_names: List[str], days_back: int, out_dir: str) -> Dict[str, Path]:
+        # Write each channel's messages as <channel>.jsonl without holding the history in memory
+        out_path = Path(out_dir)
+        out_path.mkdir(parents=True, exist_ok=True)
+        written = {}
+        oldest = _window_start(days_back)
         
-        for channel_name, channel_id in channels.items():
-            self.logger.info(f"Collecting data from {channel_name}")
-            messages = self.get_channel_history(channel_id, days_back)
+        for channel_name, channel_id in self.get_channels(channel_names).items():
+            path = out_path / f"{channel_name.lstrip('#')}.jsonl"
+            tmp_path = path.with_suffix('.tmp')
+            count = 0
             
-            # Enrich messages with reaction data
-            for message in messages:
-                if "reactions" not in message:
-                    reactions = self.get_message_reactions(channel_id, message["ts"])
-                    message["reactions"] = reactions
+            try:
+                with open(tmp_path, 'wb', buffering=JSONL_BUFFER_BYTES) as f:
+                    for message in self.iter_channel_history(channel_id, days_back, oldest, raise_errors=True):
+                        message.setdefault("reactions", [])
+                        f.write(orjson.dumps(message, option=orjson.OPT_APPEND_NEWLINE))
+                        count += 1
+                os.replace(tmp_path, path)
+            except BaseException:
+                # Never leave a partial export behind
+                tmp_path.unlink(missing_ok=True)
+                raise
             
-            channel_data[channel_name] = messages
-            self.logger.info(f"Collected {len(messages)} messages from {channel_name}")
+            self.logger.info(f"Wrote {count} messages from {channel_name} to {path}")
+            written[channel_name] = path
         
-        return channel_data
+        return written
     
     def test_connection(self) -> bool:
         try:
-            response = self.client.auth_test()
+            response = self.call('auth.test', self.client.auth_test)
             self.logger.info(f"Connected as: {response['user']}")
             return True
         except SlackApiError as e:
@@ -0,0 +1,129 @@
+import re
+import emoji
+from bisect import bisect_right
+import numpy as np
+from typing import Dict, List
+
+# Text and emoji helpers shared by the VADER and GPT sentiment analyzers
+
+# Slack markup stripped before scoring, applied in this order
+_URL_RE = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+_USER_RE = re.compile(r'<@[UW][A-Z0-9]+(?:\|[^>]+)?>')
+_CHANNEL_RE = re.compile(r'<#[C][A-Z0-9]+(?:\|[^>]+)?>')
+_SLACK_RE = re.compile(r'<[^>]+>')
+
+# Emoji are matched one character at a time, so only single-character keys apply
+_EMOJI_RE = re.compile('[' + ''.join(sorted(re.escape(e) for e in emoji.EMOJI_DATA if len(e) == 1)) + ']')
+
+# Emoji sentiment mapping
+EMOJI_SENTIMENT = {
+    '😊': 0.8, '😀': 0.8, '😃': 0.8, '😄': 0.8, '😁': 0.8,
+    '😆': 0.7, '😂': 0.9, '🤣': 0.9, '😇': 0.6, '🙂': 0.5,
+    '😉': 0.5, '😋': 0.6, '😎': 0.7, '🤗': 0.8, '🤩': 0.9,
+    '😍': 0.9, '🥰': 0.9, '😘': 0.8, '😗': 0.6, '☺️': 0.6,
+    '😌': 0.4, '😏': 0.3, '🤔': 0.1, '🙄': -0.3, '😒': -0.4,
+    '😔': -0.6, '😞': -0.7, '😟': -0.6, '😢': -0.8, '😭': -0.9,
+    '😤': -0.5, '😠': -0.7, '😡': -0.8, '🤬': -0.9, '😰': -0.6,
+    '😨': -0.7, '😱': -0.8, '😪': -0.4, '🙃': 0.2, '😶': 0.0,
+    '🤐': -0.1, '😐': 0.0, '😑': -0.1, '🤨': -0.2, '🧐': 0.1,
+    '🤯': -0.3, '😵': -0.5, '🥴': -0.2, '🤮': -0.8, '🤢': -0.6,
+    '🤧': -0.3, '😷': -0.2, '🤒': -0.4, '🤕': -0.5, '👍': 0.6,
+    '👎': -0.6, '👏': 0.7, '🙌': 0.8, '👌': 0.5, '✨': 0.6,
+    '🎉': 0.9, '🎊': 0.8, '💪': 0.7, '🔥': 0.8, '⭐': 0.6,
+    '💯': 0.8, '✅': 0.6, '❌': -0.5, '⚠️': -0.3, '🚨': -0.6,
+    '💔': -0.8, '❤️': 0.9, '💕': 0.8, '💖': 0.8, '💗': 0.8,
+    '😴': -0.1, '💤': -0.1, '🤤': 0.1, '😻': 0.8, '💀': -0.7
+}
+
+# Score per codepoint for batch scoring; unknown emoji score 0.0 like the dict lookup
+_SINGLE_CHAR_SCORES = {ord(em): score for em, score in EMOJI_SENTIMENT.items() if len(em) == 1}
+_EMOJI_SCORE_TABLE = np.zeros(max(_SINGLE_CHAR_SCORES) + 1, dtype=np.float64)
+_EMOJI_SCORE_TABLE[list(_SINGLE_CHAR_SCORES)] = list(_SINGLE_CHAR_SCORES.values())
+
+# Reaction name -> sentiment; Slack names reactions by shortcode rather than by character
+REACTION_SENTIMENT = {emoji.demojize(em).strip(':'): score for em, score in EMOJI_SENTIMENT.items()}
+
+# Lower bounds of each category above very_negative; a score on a bound takes the higher label
+SENTIMENT_THRESHOLDS = (-0.5, -0.1, 0.1, 0.5)
+SENTIMENT_LABELS = ('very_negative', 'negative', 'neutral', 'positive', 'very_positive')
+_SENTIMENT_THRESHOLD_ARRAY = np.array(SENTIMENT_THRESHOLDS)
+_SENTIMENT_LABEL_ARRAY = np.array(SENTIMENT_LABELS)
+
+def clean_text_for_analysis(text: str) -> str:
+    # Each pattern needs a literal marker, so plain messages skip the regex engine
+    # Remove URLs
+    if 'http' in text:
+        text = _URL_RE.sub('', text)
+    if '<' in text:
+        # Remove user mentions
+        if '<@' in text:
+            text = _USER_RE.sub('', text)
+        # Remove channel mentions
+        if '<#' in text:
+            text = _CHANNEL_RE.sub('', text)
+        # Remove special Slack formatting
+        if '<' in text:
+            text = _SLACK_RE.sub('', text)
+    # Remove excess whitespace
+    text = ' '.join(text.split())
+    return text.strip()
+
+def extract_emojis(text: str) -> List[str]:
+    # No emoji is ASCII, and most messages are plain ASCII
+    if text.isascii():
+        return []
+    return _EMOJI_RE.findall(text)
+
+def mean_emoji_sentiment(emojis: List[str]) -> float:
+    if not emojis:
+        return 0.0
+    
+    get_sentiment = EMOJI_SENTIMENT.get
+    return sum(get_sentiment(em, 0.0) for em in emojis) / len(emojis)
+
+def mean_emoji_sentiments(emoji_lists: List[List[str]]) -> np.ndarray:
+    # Mean emoji score per message from one table lookup over all messages' emoji
+    counts = np.fromiter(map(len, emoji_lists), dtype=np.int64, count=len(emoji_lists))
+    sentiments = np.zeros(len(emoji_lists), dtype=np.float64)
+    has_emoji = counts > 0
+    if not has_emoji.any():
+        return sentiments
+    
+    codepoints = np.fromiter(
+        (ord(em) for emojis in emoji_lists for em in emojis),
+        dtype=np.int64, count=int(counts.sum())
+    )
+    table = _EMOJI_SCORE_TABLE
+    scores = table[np.where(codepoints < len(table), codepoints, 0)]
+    
+    # Empty messages add no rows, so the non-empty starts delimit every segment
+    starts = np.cumsum(counts) - counts
+    sentiments[has_emoji] = np.add.reduceat(scores, starts[has_emoji]) / counts[has_emoji]
+    return sentiments
+
+def mean_reaction_sentiment(reactions: List[Dict]) -> Dict[str, float]:
+    if not reactions:
+        return {'reaction_sentiment': 0.0, 'reaction_count': 0}
+    
+    total_sentiment = 0.0
+    total_count = 0
+    
+    # Slack always sends name and count; unknown names default positive
+    get_sentiment = REACTION_SENTIMENT.get
+    for reaction in reactions:
+        count = reaction['count']
+        total_sentiment += get_sentiment(reaction['name'], 0.3) * count
+        total_count += count
+    
+    avg_sentiment = total_sentiment / total_count if total_count > 0 else 0.0
+    
+    return {
+        'reaction_sentiment': avg_sentiment,
+        'reaction_count': total_count
+    }
+
+def categorize_sentiment(sentiment_score: float) -> str:
+    return SENTIMENT_LABELS[bisect_right(SENTIMENT_THRESHOLDS, sentiment_score)]
+
+def categorize_sentiments(sentiment_scores: np.ndarray) -> np.ndarray:
+    return _SENTIMENT_LABEL_ARRAY[np.searchsorted(_SENTIMENT_THRESHOLD_ARRAY, sentiment_scores, side='right')]
\ No newline at end of file